@@ -1,34 +1,55 @@
 import frappe
 import base64
+import hashlib
+import hmac
 import random
-from frappe.utils.password import check_password, update_password
-from frappe.utils import escape_html, get_url
+from frappe.utils.password import (
+    check_password,
+    get_decrypted_password,
+    set_encrypted_password,
+    update_password,
+)
+from frappe.utils import cint, escape_html, get_url
+from erptech_lead.api.rate_limit import rate_limited
 from erptech_lead.api.utils import create_response
 
+# Columns needed to authenticate and build the login response in one query
+LOGIN_USER_FIELDS = [
+    "name", "enabled", "first_name", "last_name", "gender", "birth_date",
+    "mobile_no", "username", "full_name", "email", "user_image",
+    "role_profile_name", "api_key",
+]
+
+def get_login_user(usr):
+    """Resolve a login id (user name or username) to its User row in a single query"""
+    if not usr:
+        return None
+    users = frappe.get_all(
+        "User",
+        or_filters={"name": usr, "username": usr},
+        fields=LOGIN_USER_FIELDS,
+        limit=2,
+    )
+    # Prefer an exact match on name over a username that happens to equal it
+    for user in users:
+        if user.name == usr:
+            return user
+    return users[0] if users else None
+
 @frappe.whitelist(allow_guest=True)
+@rate_limited("login", identity_param="usr", ip_bucket="login_ip")
 def login(usr, pwd, device_id=None):
-    # Pre-check: if the user exists and is disabled, return a clear error
-    try:
-        user_name = frappe.db.get_value("User", {"name": usr}, "name") or frappe.db.get_value("User", {"username": usr}, "name")
-        if user_name:
-            is_enabled = frappe.db.get_value("User", user_name, "enabled")
-            if not is_enabled:
-                frappe.clear_messages()
-                frappe.local.response.http_status_code = 403
-                frappe.local.response["message"] = "Your account is disabled"
-                return
-    except Exception:
-        pass
+    # Single lookup: resolves username, reports disabled accounts and feeds the response
+    user = get_login_user(usr)
+    if user and not user.enabled:
+        frappe.clear_messages()
+        frappe.local.response.http_status_code = 403
+        frappe.local.response["message"] = "Your account is disabled"
+        return
+
     try:
         login_manager = frappe.auth.LoginManager()
-        login_manager.authenticate(user=usr, pwd=pwd)
-        # Block login if user is disabled
-        is_enabled = frappe.get_value("User", login_manager.user, "enabled")
-        if not is_enabled:
-            frappe.clear_messages()
-            frappe.local.response.http_status_code = 403
-            frappe.local.response["message"] = "Your account is disabled"
-            return
+        login_manager.authenticate(user=user.name if user else usr, pwd=pwd)
         login_manager.post_login()
         set_device_id(usr, device_id)
     except frappe.exceptions.AuthenticationError:
@@ -37,16 +58,12 @@ def login(usr, pwd, device_id=None):
         frappe.local.response["message"] = "Invalid Email or Password"
         return
 
-    user = frappe.get_doc("User", frappe.session.user)
+    # Login ids Frappe accepts beyond name/username (e.g. mobile number)
+    if not user or user.name != frappe.session.user:
+        user = frappe.db.get_value("User", frappe.session.user, LOGIN_USER_FIELDS, as_dict=True)
 
     api_generate = generate_keys(user)
 
-    # Update the User
-    frappe.db.set_value(
-        "User", frappe.session.user, {"api_key": str(api_generate["api_key"])}
-    )
-    frappe.db.commit()
-
     token_string = str(api_generate["api_key"]) + ":" + str(api_generate["api_secret"])
 
     # settings = frappe.get_cached_doc('Nonprofit Settings')
@@ -78,24 +95,57 @@ def set_device_id(user, device_id):
     pass
 
 def generate_keys(user):
-    """Generate or retrieve API keys for user"""
-    if not user.api_key and not user.api_secret:
-        api_secret = frappe.generate_hash(length=15)
-        api_key = frappe.generate_hash(length=15)
-        user.api_key = api_key
-        user.api_secret = api_secret
-        user.save(ignore_permissions=True)
-    else:
-        api_secret = user.get_password("api_secret")
-        api_key = user.get("api_key")
-    
+    """
+    Retrieve the user's API keys, creating them only if they don't exist yet
+
+    `user` is a User row carrying `name` and `api_key`. Nothing is written
+    when both keys already exist.
+    """
+    api_secret = None
+    if user.api_key:
+        api_secret = get_decrypted_password("User", user.name, "api_secret", raise_exception=False)
+
+    if user.api_key and api_secret:
+        return {"api_secret": api_secret, "api_key": user.api_key}
+
+    api_key = user.api_key or frappe.generate_hash(length=15)
+    api_secret = frappe.generate_hash(length=15)
+    frappe.db.set_value("User", user.name, "api_key", api_key, update_modified=False)
+    set_encrypted_password("User", user.name, api_secret, "api_secret")
+    frappe.db.commit()
+    user.api_key = api_key
+
     return {"api_secret": api_secret, "api_key": api_key}
 
+# Dedicated worker queue for outgoing mail, declared under `workers` in common_site_config
+EMAIL_QUEUE = "erptech_lead_email"
+
+def get_email_queue():
+    """Use the dedicated mail queue when a worker is configured for it, else `short`"""
+    return EMAIL_QUEUE if EMAIL_QUEUE in (frappe.conf.get("workers") or {}) else "short"
+
 def send_welcome_email(user, chapter=None, event=None):
-    """Send custom welcome email to new user"""
+    """Queue the custom welcome email for a new user"""
+    if not user.email:
+        frappe.log_error(f"No email address found for user {user.name}")
+        return
+
+    frappe.enqueue(
+        "erptech_lead.api.auth.send_welcome_email_job",
+        queue=get_email_queue(),
+        enqueue_after_commit=True,
+        user=user.name,
+        chapter=chapter,
+        event=event,
+    )
+
+def send_welcome_email_job(user, chapter=None, event=None):
+    """Background job: render and send the welcome email"""
     try:
-        if not user.email:
-            frappe.log_error(f"No email address found for user {user.name}")
+        user = frappe.db.get_value(
+            "User", user, ["name", "email", "full_name", "first_name", "role_profile_name"], as_dict=True
+        )
+        if not user or not user.email:
             return
         
         # Get organization name from settings
@@ -103,32 +153,38 @@ def send_welcome_email(user, chapter=None, event=None):
         
         # Get chapter info if chapter parameter exists
         chapter_info = None
-        if chapter and frappe.db.exists("Chapter", chapter):
+        if chapter:
             try:
-                chapter_doc = frappe.get_doc("Chapter", chapter)
-                chapter_info = {
-                    "title": chapter_doc.title,
-                    "location": chapter_doc.location or "Not specified",
-                    "description": chapter_doc.description or ""
-                }
+                chapter_doc = frappe.db.get_value(
+                    "Chapter", chapter, ["title", "location", "description"], as_dict=True
+                )
+                if chapter_doc:
+                    chapter_info = {
+                        "title": chapter_doc.title,
+                        "location": chapter_doc.location or "Not specified",
+                        "description": chapter_doc.description or ""
+                    }
             except Exception as e:
                 frappe.log_error(f"Error getting chapter info: {str(e)}")
         
         # Get event info if event parameter exists
         event_info = None
-        if event and frappe.db.exists("My Event", event):
+        if event:
             try:
-                event_doc = frappe.get_doc("My Event", event)
-                event_date = "Not specified"
-                if event_doc.event_date:
-                    event_date = event_doc.event_date.strftime("%B %d, %Y")
-                
-                event_info = {
-                    "title": event_doc.title,
-                    "location": event_doc.location or "Not specified",
-                    "event_date": event_date,
-                    "description": event_doc.description or ""
-                }
+                event_doc = frappe.db.get_value(
+                    "My Event", event, ["title", "location", "event_date", "description"], as_dict=True
+                )
+                if event_doc:
+                    event_date = "Not specified"
+                    if event_doc.event_date:
+                        event_date = event_doc.event_date.strftime("%B %d, %Y")
+
+                    event_info = {
+                        "title": event_doc.title,
+                        "location": event_doc.location or "Not specified",
+                        "event_date": event_date,
+                        "description": event_doc.description or ""
+                    }
             except Exception as e:
                 frappe.log_error(f"Error getting event info: {str(e)}")
         
@@ -153,13 +209,25 @@ def send_welcome_email(user, chapter=None, event=None):
             header=["Welcome to My Lead", "blue"]
         )
         
-        frappe.log_error(f"Welcome email sent to {user.email}", "Welcome Email")
-        
     except Exception as e:
         frappe.log_error(f"Error sending welcome email: {str(e)}", "Welcome Email Error")
 
+def send_otp_email_job(email, otp):
+    """Background job: render and send the password reset OTP"""
+    try:
+        frappe.sendmail(
+            recipients=[email],
+            subject="Your OTP Code",
+            template="otp_email_template",
+            args={"otp": otp},
+            header=["OTP Verification", "blue"]
+        )
+    except Exception:
+        frappe.log_error(frappe.get_traceback(), "OTP Email Error")
+
 # Sign Up
 @frappe.whitelist(allow_guest=True)
+@rate_limited("sign_up", identity_param="email")
 def sign_up():
     email = frappe.local.form_dict.email
     # password = frappe.local.form_dict.password
@@ -194,7 +262,7 @@ def sign_up():
         user.flags.disable_email_notifications = True
         user.insert(ignore_permissions=True)
 
-        # Send custom welcome email
+        # Queue custom welcome email
         send_welcome_email(user, chapter, event)
 
         # Create Chapter Users record if chapter parameter exists
@@ -210,7 +278,6 @@ def sign_up():
                     # Disable email notifications for initial creation
                     chapter_user.flags.disable_email_notifications = True
                     chapter_user.insert(ignore_permissions=True)
-                    frappe.log_error(f"Chapter Users record created for user {user.name} and chapter {chapter}", "Chapter Users Creation")
                 except Exception as e:
                     frappe.log_error(f"Error creating Chapter Users record: {str(e)}", "Chapter Users Creation Error")
             else:
@@ -229,7 +296,6 @@ def sign_up():
                     # Disable email notifications for initial creation
                     event_user.flags.disable_email_notifications = True
                     event_user.insert(ignore_permissions=True)
-                    frappe.log_error(f"Event Users record created for user {user.name} and event {event}", "Event Users Creation")
                 except Exception as e:
                     frappe.log_error(f"Error creating Event Users record: {str(e)}", "Event Users Creation Error")
             else:
@@ -246,16 +312,44 @@ def test_welcome_email(user_email, chapter=None, event=None):
     try:
         user = frappe.get_doc("User", {"email": user_email})
         send_welcome_email(user, chapter, event)
-        return {"status": "success", "message": "Welcome email sent successfully"}
+        return {"status": "success", "message": "Welcome email queued successfully"}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+# Permission columns of Custom DocPerm merged into the map returned to the frontend
+PERMISSION_COLUMNS = [
+    "permlevel", "if_owner", "select", "read", "write", "create", "delete",
+    "submit", "cancel", "amend", "report", "export", "import",
+    "set_user_permissions", "share", "print", "email",
+]
+PERMISSIONS_MAP_CACHE_KEY = "erptech_lead:permissions_map"
+
+# Role Permission Manager writes Custom DocPerm with db.set_value (no doc events), so
+# entries also expire on their own
+PERMISSIONS_MAP_CACHE_TTL = 300
+
 def get_permissions_map(role_profile_name):
-    user_roles = frappe.get_roles(frappe.session.user)
-    permissions = frappe.get_all(
-        "Custom DocPerm", 
-        fields=["*"], 
-        filters={"role": ["in", user_roles]}
+    """Merged Custom DocPerm map for the session user's roles, cached per sorted role set"""
+    roles = sorted(set(frappe.get_roles(frappe.session.user)))
+    role_key = hashlib.sha1("\n".join(roles).encode()).hexdigest()
+    cache_key = f"{PERMISSIONS_MAP_CACHE_KEY}:{role_key}"
+
+    permissions_map = frappe.cache().get_value(cache_key)
+    if permissions_map is None:
+        permissions_map = build_permissions_map(roles)
+        frappe.cache().set_value(cache_key, permissions_map, expires_in_sec=PERMISSIONS_MAP_CACHE_TTL)
+    return permissions_map
+
+def build_permissions_map(roles):
+    columns = ", ".join(f"`{column}`" for column in PERMISSION_COLUMNS)
+    permissions = frappe.db.sql(
+        f"""
+        SELECT `parent`, {columns}
+        FROM `tabCustom DocPerm`
+        WHERE `role` IN %(roles)s
+        """,
+        {"roles": roles},
+        as_dict=True
     )
 
     permissions_by_doctype = {}
@@ -263,21 +357,24 @@ def get_permissions_map(role_profile_name):
         doctype = perm.get('parent')
         if doctype not in permissions_by_doctype:
             permissions_by_doctype[doctype] = {}
-        
+
         # Aggregate permissions: if any role grants a permission, it's granted (value of 1).
-        for key, value in perm.items():
-            if key not in ['name', 'parent', 'role', 'creation', 'modified', 'modified_by', 'owner', 'docstatus', 'idx', 'parentfield', 'parenttype']:
-                if permissions_by_doctype[doctype].get(key) != 1:
-                    permissions_by_doctype[doctype][key] = value
+        for key in PERMISSION_COLUMNS:
+            if permissions_by_doctype[doctype].get(key) != 1:
+                permissions_by_doctype[doctype][key] = perm.get(key)
 
     return permissions_by_doctype
 
-@frappe.whitelist()
-def profile():
-    user = frappe.get_doc("User", frappe.session.user)
+def clear_permissions_map_cache(doc=None, method=None):
+    """Doc event and clear_cache handler for Custom DocPerm, Role and Role Profile changes"""
+    frappe.cache().delete_keys(PERMISSIONS_MAP_CACHE_KEY)
+
+def build_profile_payload():
+    """Session user's profile with the merged permissions map, from the document and permission caches"""
+    user = frappe.get_cached_doc("User", frappe.session.user)
     # settings = frappe.get_cached_doc('Nonprofit Settings')
 
-    frappe.response["user"] = {
+    return {
         "id": escape_html(user.name or ""),
         "first_name": escape_html(user.first_name or ""),
         "last_name": escape_html(user.last_name or ""),
@@ -292,6 +389,10 @@ def profile():
         "role_profile_name": user.role_profile_name,
         # "settings": settings,
     }
+
+@frappe.whitelist()
+def profile():
+    frappe.response["user"] = build_profile_payload()
     return
 
 # Update Profile
@@ -333,6 +434,7 @@ def update_profile():
             }
         )
         frappe.db.commit()
+        frappe.clear_document_cache("User", frappe.session.user)
 
         return {"status": "success", "message": ("Profile updated successfully")}
 
@@ -399,33 +501,27 @@ def change_password():
  # Forgot Password
 
 @frappe.whitelist(allow_guest=True)
+@rate_limited("forgot_password", identity_param="email")
 def forgot_password():
     # Parameters
     email = frappe.local.form_dict.email
 
     # Validate if the user exists
-    try:
-        username = frappe.get_doc("User", {"email": email})
-    except frappe.DoesNotExistError:
+    username = frappe.db.get_value("User", {"email": email}, "name")
+    if not username:
         return {"status": "failed", "message": "User does not exist"}
 
     # Update the OPT
     try:
         otp = random.randint(1000, 9999)
-        frappe.db.set_value(
-            "User", username, {
-                "otp": otp
-            }
-        )
-        frappe.db.commit()
-
-         # Send Email
-        frappe.sendmail(
-            recipients=[email],
-            subject="Your OTP Code",
-            template="otp_email_template",
-            args={"otp": otp},
-            header=["OTP Verification", "blue"]
+        store_otp(email, otp)
+
+        # Queue Email
+        frappe.enqueue(
+            "erptech_lead.api.auth.send_otp_email_job",
+            queue=get_email_queue(),
+            email=email,
+            otp=otp,
         )
 
         create_response(
@@ -454,13 +550,23 @@ def reset_password():
     cPassword = frappe.local.form_dict.cPassword
 
     # Validate if the user exists
-    try:
-        username = frappe.get_doc("User", {"email": email})
-    except frappe.DoesNotExistError:
+    username = frappe.db.get_value("User", {"email": email}, "name")
+    if not username:
         return {"status": "failed", "message": "User does not exist"}
 
     # Validate if the OTP match
-    if username.otp != otp:
+    otp_status = verify_otp(email, otp)
+    if otp_status == "expired":
+        return {
+            "status": "failed",
+            "message": ("otp expired, please request a new one"),
+        }
+    if otp_status == "locked":
+        return {
+            "status": "failed",
+            "message": ("Too many invalid attempts, please request a new otp"),
+        }
+    if otp_status != "valid":
         return {
             "status": "failed",
             "message": ("otp gives error"),
@@ -475,15 +581,8 @@ def reset_password():
     
     # Update the password
     try:
-
-        frappe.db.set_value(
-            "User", username, {
-                "otp": ''
-            }
-        )
-        frappe.db.commit()
-
-        update_password(username.name, new_password)
+        update_password(username, new_password)
+        clear_otp(email)
 
         return {"status": "success", "message": ("Password updated successfully")}
 
@@ -495,3 +594,59 @@ def reset_password():
                 str(e)
             ),
         }
+
+# OTP store
+OTP_CACHE_PREFIX = "erptech_lead:otp"
+
+def get_otp_ttl():
+    """OTP lifetime in seconds, overridable with `erptech_lead_otp_ttl` in site config"""
+    return cint(frappe.conf.get("erptech_lead_otp_ttl") or 600)
+
+def get_otp_max_attempts():
+    """Wrong guesses allowed per OTP, overridable with `erptech_lead_otp_max_attempts`"""
+    return cint(frappe.conf.get("erptech_lead_otp_max_attempts") or 5)
+
+def get_otp_keys(email):
+    cache = frappe.cache()
+    email = (email or "").strip().lower()
+    return (
+        cache.make_key(f"{OTP_CACHE_PREFIX}:{email}"),
+        cache.make_key(f"{OTP_CACHE_PREFIX}:{email}:attempts"),
+    )
+
+def store_otp(email, otp):
+    """Keep the OTP in Redis with a TTL and a fresh attempt counter, replacing any earlier one"""
+    otp_key, attempts_key = get_otp_keys(email)
+    pipe = frappe.cache().pipeline()
+    pipe.set(otp_key, str(otp), ex=get_otp_ttl())
+    pipe.delete(attempts_key)
+    pipe.execute()
+
+def verify_otp(email, otp):
+    """
+    Check an OTP without touching the User table
+
+    Returns "valid", "invalid", "expired" (nothing stored) or "locked"
+    (attempt limit reached, the OTP is discarded).
+    """
+    cache = frappe.cache()
+    otp_key, attempts_key = get_otp_keys(email)
+
+    stored = cache.get(otp_key)
+    if stored is None:
+        return "expired"
+
+    pipe = cache.pipeline()
+    pipe.incr(attempts_key)
+    pipe.expire(attempts_key, get_otp_ttl())
+    attempts = pipe.execute()[0]
+    if attempts > get_otp_max_attempts():
+        clear_otp(email)
+        return "locked"
+
+    if not hmac.compare_digest(frappe.safe_decode(stored), str(otp or "")):
+        return "invalid"
+    return "valid"
+
+def clear_otp(email):
+    frappe.cache().delete(*get_otp_keys(email))
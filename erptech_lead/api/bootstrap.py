@@ -0,0 +1,95 @@
+"""
+App Bootstrap: one round trip for the data the frontend needs on startup
+"""
+import frappe
+import hashlib
+import json
+from datetime import datetime
+from erptech_lead.api.auth import build_profile_payload
+from erptech_lead.api.cache import get_or_build, get_report_cache_key, get_report_cache_ttl
+from erptech_lead.api.hooks import build_statistics
+from erptech_lead.api.utils import (
+    build_settings_payload,
+    create_response,
+    get_location_list,
+    timeOfZone,
+)
+
+
+def get_settings_section():
+    return build_settings_payload(), None
+
+
+def get_profile_section():
+    return build_profile_payload(), None
+
+
+def get_statistics_section():
+    key = get_report_cache_key("erptech_lead.api.bootstrap.statistics", {}, ["Lead", "Sales Order"])
+    return get_or_build(key, build_statistics, get_report_cache_ttl()), None
+
+
+def get_countries_section():
+    countries = get_location_list("Country")
+    return countries["data"], countries["etag"]
+
+
+# Section name -> builder returning (data, etag); a None etag is derived from the data
+BOOTSTRAP_SECTIONS = {
+    "settings": get_settings_section,
+    "profile": get_profile_section,
+    "statistics": get_statistics_section,
+    "countries": get_countries_section,
+}
+
+
+def get_section_etag(data):
+    return hashlib.md5(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+@frappe.whitelist()
+def bootstrap():
+    """
+    Get settings, profile (with permissions map), statistics and countries in one response
+
+    Every section is assembled from its cache and carries an `etag`. When the
+    client sends the etags it already holds, unchanged sections come back as
+    `{"etag": ..., "not_modified": true}` without data.
+
+    Parameters:
+        sections (list|str): Optional subset of sections, defaults to all
+        etags (dict|str): Optional {section: etag} from a previous response
+
+    Returns:
+        dict: Per section `etag` plus `data` or `not_modified`
+    """
+    try:
+        sections = frappe.local.form_dict.get("sections") or list(BOOTSTRAP_SECTIONS)
+        etags = frappe.local.form_dict.get("etags") or {}
+        if isinstance(sections, str):
+            sections = json.loads(sections) if sections.startswith("[") else sections.split(",")
+        if isinstance(etags, str):
+            etags = json.loads(etags) if etags else {}
+
+        unknown = [section for section in sections if section not in BOOTSTRAP_SECTIONS]
+        if unknown:
+            create_response(400, f"Unknown bootstrap sections: {', '.join(unknown)}", None)
+            return
+
+        result = {}
+        for section in sections:
+            data, etag = BOOTSTRAP_SECTIONS[section]()
+            etag = etag or get_section_etag(data)
+            if etags.get(section) == etag:
+                result[section] = {"etag": etag, "not_modified": True}
+            else:
+                result[section] = {"etag": etag, "data": data}
+
+        create_response(200, "Bootstrap fetched successfully", {
+            "time": timeOfZone(datetime.now()),
+            "sections": result
+        })
+
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), "Bootstrap Error")
+        create_response(500, f"Error fetching bootstrap: {str(e)}", None)
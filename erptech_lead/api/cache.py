@@ -0,0 +1,165 @@
+"""
+Shared Cache Helpers for My Lead
+"""
+import frappe
+import functools
+import hashlib
+import json
+import time
+from frappe.utils import cint, today
+from erptech_lead.api.utils import create_response
+
+REPORT_CACHE_PREFIX = "erptech_lead:report"
+REPORT_CACHE_GENERATIONS = f"{REPORT_CACHE_PREFIX}:generation"
+
+# Request parameters that never change the result of a report
+IGNORED_PARAMS = ("cmd", "_")
+
+# Delete the build lock only while it still holds this worker's token
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def get_report_cache_ttl():
+    """Default TTL in seconds, overridable with `erptech_lead_report_cache_ttl` in site config"""
+    return cint(frappe.conf.get("erptech_lead_report_cache_ttl") or 60)
+
+
+def get_permission_scope():
+    """Short hash of the session's role set, so users with the same roles share entries"""
+    roles = sorted(set(frappe.get_roles()))
+    return hashlib.sha1("\n".join(roles).encode()).hexdigest()[:16]
+
+
+def get_generations(doctypes):
+    """Current invalidation generation of each doctype a report depends on"""
+    if not doctypes:
+        return []
+    cache = frappe.cache()
+    generations = cache.hmget(cache.make_key(REPORT_CACHE_GENERATIONS), list(doctypes))
+    return [cint(generation) for generation in generations]
+
+
+def get_report_cache_key(endpoint, params, depends_on):
+    normalized = json.dumps(
+        {key: value for key, value in params.items() if key not in IGNORED_PARAMS},
+        sort_keys=True,
+        default=str,
+    )
+    signature = json.dumps(
+        [normalized, get_permission_scope(), today(), get_generations(depends_on)]
+    )
+    digest = hashlib.sha1(signature.encode()).hexdigest()
+    return f"{REPORT_CACHE_PREFIX}:{endpoint}:{digest}"
+
+
+def cached_report(depends_on, ttl=None, lock_timeout=10):
+    """
+    Cache the response of a whitelisted report endpoint
+
+    Entries are keyed by endpoint, normalized request parameters, the
+    caller's role set and the current date. Saving any doctype in
+    `depends_on` bumps its generation (see `invalidate_report_cache`), which
+    makes every entry built on the old generation unreachable.
+
+    Concurrent misses for the same key are collapsed: the first caller takes
+    a short lock and computes, the others wait for its result and only
+    compute themselves if the lock expires.
+
+    Only successful (200) responses are cached. Must be applied below
+    `@frappe.whitelist()`.
+    """
+    def decorator(fn):
+        endpoint = f"{fn.__module__}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            expires_in = get_report_cache_ttl() if ttl is None else ttl
+            if expires_in <= 0:
+                return fn(*args, **kwargs)
+
+            params = dict(frappe.local.form_dict)
+            params.update(kwargs)
+            key = get_report_cache_key(endpoint, params, depends_on)
+
+            computed = {}
+
+            def build():
+                computed["result"] = fn(*args, **kwargs)
+                response = frappe.local.response
+                if response.get("http_status_code") != 200:
+                    return None
+                return {
+                    "message": response.get("message"),
+                    "data": response.get("data"),
+                    "result": computed["result"],
+                }
+
+            cached = get_or_build(key, build, expires_in, lock_timeout)
+            if "result" in computed:
+                # This worker ran the endpoint, the response is already set
+                return computed["result"]
+            return _replay(cached)
+
+        return wrapper
+
+    return decorator
+
+
+def get_or_build(key, builder, expires_in, lock_timeout=10):
+    """
+    Return the cached value for `key`, calling `builder` once across workers on a miss
+
+    A `None` from the builder is returned but not cached. The lock holds a
+    token unique to this call, so a build that outlives `lock_timeout` can't
+    release a lock another worker has taken since.
+    """
+    cache = frappe.cache()
+
+    cached = cache.get_value(key)
+    if cached is not None:
+        return cached
+
+    lock_key = cache.make_key(f"{key}:lock")
+    token = frappe.generate_hash(length=16)
+    if not cache.set(lock_key, token, nx=True, ex=lock_timeout):
+        cached = _wait_for(key, lock_key, lock_timeout)
+        if cached is not None:
+            return cached
+
+    try:
+        value = builder()
+        if value is not None:
+            cache.set_value(key, value, expires_in_sec=expires_in)
+        return value
+    finally:
+        cache.register_script(RELEASE_LOCK_SCRIPT)(keys=[lock_key], args=[token])
+
+
+def _wait_for(key, lock_key, lock_timeout):
+    """Poll for another worker's result while it holds the lock"""
+    cache = frappe.cache()
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        cached = cache.get_value(key)
+        if cached is not None:
+            return cached
+        if cache.get(lock_key) is None:
+            return cache.get_value(key)
+    return None
+
+
+def _replay(cached):
+    create_response(200, cached["message"], cached["data"])
+    return cached["result"]
+
+
+def invalidate_report_cache(doc, method=None):
+    """Doc event handler: drop every cached report that depends on this doctype"""
+    cache = frappe.cache()
+    cache.hincrby(cache.make_key(REPORT_CACHE_GENERATIONS), doc.doctype, 1)
@@ -1,6 +1,60 @@
 import frappe
 import json
+from erptech_lead.api.rate_limit import rate_limited
 from erptech_lead.api.utils import create_response
+from erptech_lead.my_lead.doctype.plot_detail.plot_detail import (
+    NUMERIC_DIMENSION_FIELDS,
+    get_numeric_dimensions,
+)
+
+# Free text fields whose comparisons list_data serves from an indexed numeric column
+NUMERIC_FILTER_FIELDS = {"Plot Detail": NUMERIC_DIMENSION_FIELDS}
+RANGE_OPERATORS = (">", ">=", "<", "<=", "between")
+
+
+def apply_range_filters(doctype, filters, ranges):
+    """
+    Filters with numeric comparisons moved to the numeric columns, plus `ranges`
+
+    `ranges` is {fieldname: [from, to]} with either end optional, e.g.
+    {"plot_size_sqft": [1200, 2400]}; the free text name ("plot_size") may be
+    used instead of the numeric column. Malformed ranges or fields without a
+    numeric column raise a ValidationError.
+    """
+    numeric_fields = NUMERIC_FILTER_FIELDS.get(doctype) or {}
+    if not isinstance(ranges or {}, dict):
+        frappe.throw("Ranges must be an object of {fieldname: [from, to]}", frappe.ValidationError)
+    if isinstance(filters, dict):
+        filters = [
+            [fieldname, *value] if isinstance(value, (list, tuple)) else [fieldname, "=", value]
+            for fieldname, value in filters.items()
+        ]
+
+    rewritten = []
+    for condition in filters:
+        condition = list(condition)
+        position = 1 if len(condition) == 4 else 0
+        if (
+            len(condition) >= 3
+            and condition[position] in numeric_fields
+            and condition[position + 1] in RANGE_OPERATORS
+        ):
+            condition[position] = numeric_fields[condition[position]]
+        rewritten.append(condition)
+
+    for fieldname, value in (ranges or {}).items():
+        if fieldname not in numeric_fields and fieldname not in numeric_fields.values():
+            frappe.throw(f"Range filter is not supported for {fieldname}", frappe.ValidationError)
+        if not isinstance(value, (list, tuple)) or len(value) != 2:
+            frappe.throw(f"Range for {fieldname} must be a [from, to] pair", frappe.ValidationError)
+        start, end = value
+        fieldname = numeric_fields.get(fieldname, fieldname)
+        if start not in (None, ""):
+            rewritten.append([fieldname, ">=", start])
+        if end not in (None, ""):
+            rewritten.append([fieldname, "<=", end])
+
+    return rewritten
 
 @frappe.whitelist()
 def list_info():
@@ -120,6 +174,7 @@ def list_data():
         fields = frappe.local.form_dict.get("fields") or []
         filters = frappe.local.form_dict.get("filters") or []
         or_filters = frappe.local.form_dict.get("or_filters") or []
+        ranges = frappe.local.form_dict.get("ranges") or {}
         # Parse JSON strings (frontend may send params as JSON strings)
         if isinstance(fields, str):
             fields = json.loads(fields) if fields else []
@@ -127,6 +182,10 @@ def list_data():
             filters = json.loads(filters) if filters else []
         if isinstance(or_filters, str):
             or_filters = json.loads(or_filters) if or_filters else []
+        if isinstance(ranges, str):
+            ranges = json.loads(ranges) if ranges else {}
+        if ranges or doctype in NUMERIC_FILTER_FIELDS:
+            filters = apply_range_filters(doctype, filters, ranges)
         if not fields:
             fields = ["*"]
         page = int(frappe.local.form_dict.get("page", 1))
@@ -177,6 +236,8 @@ def list_data():
             {"counts": counts[0].get("COUNT(*)", 0), "data": enhanced_data},
         )
 
+    except frappe.ValidationError as ex:
+        create_response(400, str(ex))
     except Exception as ex:
         frappe.log_error(frappe.get_traceback(), "Error in fetching item list")
         create_response(500, ex)
@@ -297,16 +358,24 @@ def update_data():
         values = []
         
         # Handle if update_fields is a list of dictionaries
+        updates = {}
         if isinstance(update_fields, list):
             for update_dict in update_fields:
-                for field_name, field_value in update_dict.items():
-                    set_clauses.append(f"`{field_name}` = %s")
-                    values.append(field_value)
+                updates.update(update_dict)
         else:
             # Handle if update_fields is a single dictionary
-            for field_name, field_value in update_fields.items():
-                set_clauses.append(f"`{field_name}` = %s")
-                values.append(field_value)
+            updates.update(update_fields)
+
+        # The raw UPDATE skips validate, so recompute the numeric dimension columns here
+        if doctype in NUMERIC_FILTER_FIELDS and any(field in updates for field in NUMERIC_DIMENSION_FIELDS):
+            current = frappe.db.get_value(doctype, name, list(NUMERIC_DIMENSION_FIELDS), as_dict=True)
+            if current:
+                current.update({field: updates[field] for field in NUMERIC_DIMENSION_FIELDS if field in updates})
+                updates.update(get_numeric_dimensions(current))
+
+        for field_name, field_value in updates.items():
+            set_clauses.append(f"`{field_name}` = %s")
+            values.append(field_value)
         
         # Add modified timestamp
         set_clauses.append("`modified` = %s")
@@ -349,6 +418,7 @@ def update_data():
 
 
 @frappe.whitelist(allow_guest=True)
+@rate_limited("lead_capture")
 def create_lead_with_customer():
     """
     Create a Lead with Customer and Plot Details in a single transaction.
@@ -474,6 +544,7 @@ def create_lead_with_customer():
         create_response(500, f"Error creating lead: {str(ex)}", {})
 
 @frappe.whitelist(allow_guest=True)
+@rate_limited("lead_capture")
 def create_customer():
     """
     Create a Customer document.
@@ -529,6 +600,7 @@ def create_customer():
         create_response(500, f"Error creating customer: {str(ex)}", {})
 
 @frappe.whitelist(allow_guest=True)
+@rate_limited("lead_capture")
 def create_lead():
     """
     Create a Lead document.
@@ -592,6 +664,7 @@ def create_lead():
         create_response(500, f"Error creating lead: {str(ex)}", {})
 
 @frappe.whitelist(allow_guest=True)
+@rate_limited("lead_capture")
 def create_management():
     """
     Create a Management document.
@@ -0,0 +1,205 @@
+"""
+Follow-up Queue APIs for My Lead
+"""
+import frappe
+from frappe.model.db_query import DatabaseQuery
+from frappe.utils import add_days, cint, getdate, today
+from erptech_lead.api.utils import create_response
+
+# Follow-ups that no longer need action
+CLOSED_FOLLOWUP_STATUSES = ("Completed", "Cancelled")
+
+# Leads that are no longer followed up
+CLOSED_LEAD_STATUSES = ("Converted", "Do Not Contact")
+
+# One query per source, each an index range scan on its due date column.
+# Parent tables keep their real names so Frappe's match conditions apply as-is.
+FOLLOWUP_SOURCES = {
+    "Legal": {
+        "parent": "Legal",
+        "from": "`tabAll FollowUp` child INNER JOIN `tabLegal` ON `tabLegal`.name = child.parent",
+        "due_date": "child.next_followup_date",
+        "agent": "`tabLegal`.created_by",
+        "fields": """`tabLegal`.fir_case_number AS title, child.followup_type, child.followup_with,
+            child.contact_number, child.purpose AS details, child.followup_status""",
+        "conditions": "child.parenttype = 'Legal' AND IFNULL(child.followup_status, '') NOT IN %(closed_followup)s",
+    },
+    "Legal Plot": {
+        "parent": "Legal Plot",
+        "from": "`tabAll FollowUp` child INNER JOIN `tabLegal Plot` ON `tabLegal Plot`.name = child.parent",
+        "due_date": "child.next_followup_date",
+        "agent": "`tabLegal Plot`.entered_by",
+        "fields": """`tabLegal Plot`.property_id AS title, child.followup_type, child.followup_with,
+            child.contact_number, child.purpose AS details, child.followup_status""",
+        "conditions": "child.parenttype = 'Legal Plot' AND IFNULL(child.followup_status, '') NOT IN %(closed_followup)s",
+    },
+    "Lead Follow Up History": {
+        "parent": "Lead",
+        "from": "`tabLead Follow Up History` child INNER JOIN `tabLead` ON `tabLead`.name = child.parent",
+        "due_date": "child.next_date",
+        "agent": "`tabLead`.custom_assigned_user",
+        "fields": """`tabLead`.lead_name AS title, NULL AS followup_type, NULL AS followup_with,
+            `tabLead`.mobile_no AS contact_number, child.description AS details, NULL AS followup_status""",
+        # Only the latest history entry of a lead is still open
+        "conditions": """child.parenttype = 'Lead'
+            AND `tabLead`.status NOT IN %(closed_lead)s
+            AND NOT EXISTS (
+                SELECT 1 FROM `tabLead Follow Up History` newer
+                WHERE newer.parent = child.parent AND newer.parenttype = 'Lead' AND newer.idx > child.idx
+            )""",
+    },
+    "Lead": {
+        "parent": "Lead",
+        "from": "`tabLead`",
+        "due_date": "`tabLead`.custom_next_follow_up_date",
+        "agent": "`tabLead`.custom_assigned_user",
+        "fields": """`tabLead`.lead_name AS title, NULL AS followup_type, NULL AS followup_with,
+            `tabLead`.mobile_no AS contact_number, NULL AS details, NULL AS followup_status""",
+        "conditions": "`tabLead`.status NOT IN %(closed_lead)s",
+    },
+}
+
+# Due date window of each queue scope, as (days from today to start, days to end); None is open
+FOLLOWUP_SCOPES = {
+    "due": (None, 0),
+    "today": (0, 0),
+    "overdue": (None, -1),
+    "upcoming": (1, 7),
+}
+
+
+def get_source_conditions(source, values):
+    """WHERE clause of a source: its own conditions, the due window, agent and permissions"""
+    config = FOLLOWUP_SOURCES[source]
+    conditions = [config["conditions"], f"{config['due_date']} IS NOT NULL"]
+    if values.get("from_date"):
+        conditions.append(f"{config['due_date']} >= %(from_date)s")
+    conditions.append(f"{config['due_date']} <= %(to_date)s")
+    if values.get("agent"):
+        conditions.append(f"{config['agent']} = %(agent)s")
+
+    match_conditions = DatabaseQuery(config["parent"]).build_match_conditions()
+    if match_conditions:
+        conditions.append(match_conditions)
+    return " AND ".join(f"({condition})" for condition in conditions)
+
+
+@frappe.whitelist()
+def get_followup_queue():
+    """
+    Get the follow-ups due for an agent across Legal, Legal Plot and Lead
+
+    Reads All FollowUp (Legal and Legal Plot), the latest Lead Follow Up
+    History entry of each lead and Lead's next follow-up date, each with one
+    indexed query joined to its parent, plus one count query per source.
+    Users other than System Manager / Lead Manager only see their own queue.
+
+    Parameters:
+        scope (str): "due" (today and overdue, default), "today", "overdue" or "upcoming" (next 7 days)
+        agent (str): Optional user, defaults to all agents for managers
+        sources (str): Optional comma separated subset of Legal, Legal Plot,
+            Lead Follow Up History and Lead
+        page (int): Page number, defaults to 1
+        page_length (int): Rows per page, defaults to 20
+
+    Returns:
+        dict: data (source, reference_doctype, reference_name, title, agent,
+        due_date, overdue and follow-up details, oldest first), total and
+        counts per agent (overdue, due_today, total)
+    """
+    try:
+        form_dict = frappe.local.form_dict
+        scope = form_dict.get("scope") or "due"
+        agent = form_dict.get("agent")
+        sources = [source.strip() for source in (form_dict.get("sources") or "").split(",") if source.strip()]
+        sources = sources or list(FOLLOWUP_SOURCES)
+        page = max(cint(form_dict.get("page")) or 1, 1)
+        page_length = min(cint(form_dict.get("page_length")) or 20, 200)
+
+        if scope not in FOLLOWUP_SCOPES:
+            create_response(400, f"Scope must be one of {', '.join(FOLLOWUP_SCOPES)}", None)
+            return
+
+        unknown = [source for source in sources if source not in FOLLOWUP_SOURCES]
+        if unknown:
+            create_response(400, f"Unknown follow-up source {', '.join(unknown)}", None)
+            return
+
+        if not {"System Manager", "Lead Manager"} & set(frappe.get_roles()):
+            agent = frappe.session.user
+
+        current_date = getdate(today())
+        start_days, end_days = FOLLOWUP_SCOPES[scope]
+        values = {
+            "today": current_date,
+            "from_date": add_days(current_date, start_days) if start_days is not None else None,
+            "to_date": add_days(current_date, end_days),
+            "agent": agent,
+            "closed_followup": CLOSED_FOLLOWUP_STATUSES,
+            "closed_lead": CLOSED_LEAD_STATUSES,
+            "limit": page * page_length,
+        }
+
+        rows = []
+        counts = {}
+        for source in sources:
+            if not frappe.has_permission(FOLLOWUP_SOURCES[source]["parent"], "read"):
+                continue
+
+            config = FOLLOWUP_SOURCES[source]
+            conditions = get_source_conditions(source, values)
+
+            # Enough rows of each source to fill the requested page after merging
+            rows += frappe.db.sql(
+                f"""
+                SELECT
+                    %(source)s AS source,
+                    %(parent)s AS reference_doctype,
+                    `tab{config['parent']}`.name AS reference_name,
+                    {config['agent']} AS agent,
+                    {config['due_date']} AS due_date,
+                    {config['fields']}
+                FROM {config['from']}
+                WHERE {conditions}
+                ORDER BY due_date ASC, reference_name ASC
+                LIMIT %(limit)s
+                """,
+                {**values, "source": source, "parent": config["parent"]},
+                as_dict=True,
+            )
+
+            for row in frappe.db.sql(
+                f"""
+                SELECT
+                    {config['agent']} AS agent,
+                    SUM({config['due_date']} < %(today)s) AS overdue,
+                    SUM({config['due_date']} = %(today)s) AS due_today,
+                    COUNT(*) AS total
+                FROM {config['from']}
+                WHERE {conditions}
+                GROUP BY {config['agent']}
+                """,
+                values,
+                as_dict=True,
+            ):
+                agent_counts = counts.setdefault(row.agent or "", {"overdue": 0, "due_today": 0, "total": 0})
+                for key in ("overdue", "due_today", "total"):
+                    agent_counts[key] += cint(row[key])
+
+        rows.sort(key=lambda row: (getdate(row.due_date), row.source, row.reference_name))
+        data = rows[(page - 1) * page_length:page * page_length]
+        for row in data:
+            row.overdue = getdate(row.due_date) < current_date
+
+        create_response(200, "Follow-up queue fetched successfully", {
+            "scope": scope,
+            "from_date": str(values["from_date"]) if values["from_date"] else None,
+            "to_date": str(values["to_date"]),
+            "total": sum(agent_counts["total"] for agent_counts in counts.values()),
+            "counts": [{"agent": key or None, **value} for key, value in sorted(counts.items())],
+            "data": data
+        })
+
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), "Error in fetching follow-up queue")
+        create_response(500, f"Error fetching follow-up queue: {str(e)}", None)
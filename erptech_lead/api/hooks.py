@@ -2,52 +2,15 @@
 Document Event Hooks for My Lead
 """
 import frappe
-import re
 from frappe.share import add as add_share, remove as remove_share
+from frappe.utils import add_days, add_months, getdate, today
+from erptech_lead.api.cache import cached_report
 from erptech_lead.api.utils import create_response
-
-
-def parse_currency_string(value):
-    """
-    Parse a currency string (e.g., '50,000 AED', '1,234.56 USD') to float
-    
-    Args:
-        value: String value that may contain currency formatting
-        
-    Returns:
-        float: Numeric value extracted from the string, or 0 if parsing fails
-    """
-    if not value:
-        return 0.0
-    
-    # Convert to string if it's not already
-    value_str = str(value).strip()
-    
-    # If it's already a number, return it
-    try:
-        return float(value_str)
-    except (ValueError, TypeError):
-        pass
-    
-    # Remove currency symbols and common currency codes (AED, USD, EUR, etc.)
-    # Remove any non-digit characters except decimal point and comma
-    # First, remove currency codes (3-letter codes at the end)
-    value_str = re.sub(r'\s*[A-Z]{2,3}\s*$', '', value_str, flags=re.IGNORECASE)
-    
-    # Remove currency symbols ($, €, £, etc.)
-    value_str = re.sub(r'[$€£¥₹]', '', value_str)
-    
-    # Remove commas (thousand separators)
-    value_str = value_str.replace(',', '')
-    
-    # Strip whitespace
-    value_str = value_str.strip()
-    
-    # Try to convert to float
-    try:
-        return float(value_str) if value_str else 0.0
-    except (ValueError, TypeError):
-        return 0.0
+from erptech_lead.my_lead.doctype.sales_daily_rollup.sales_daily_rollup import (
+    rebuild_rollup,
+    refresh_bucket,
+)
+from erptech_lead.utils.currency import parse_currency_string  # re-exported for existing callers
 
 
 def on_update_lead(doc, method):
@@ -125,6 +88,7 @@ def on_update_lead(doc, method):
 
 
 @frappe.whitelist()
+@cached_report(depends_on=["Lead", "Sales Order"])
 def get_sales_report():
     """
     Get sales report data with leads, deals, and total value for each sales agent
@@ -197,7 +161,47 @@ def get_sales_report():
         create_response(500, f"Error fetching sales report: {str(e)}", None)
 
 
+def build_statistics():
+    """
+    Counts for leads, lead managers, lead users and sales orders
+
+    Returns:
+        dict: Statistics keyed as the dashboard expects them
+    """
+    # Count all Leads
+    leads_count = frappe.db.count("Lead")
+    
+    # Count Lead Managers (Users with role_profile_name = "Lead Manager")
+    lead_managers_count = frappe.db.count(
+        "User",
+        filters={
+            "role_profile_name": "Lead Manager",
+            "enabled": 1
+        }
+    )
+    
+    # Count Lead Users (Users with role_profile_name = "Lead User")
+    lead_users_count = frappe.db.count(
+        "User",
+        filters={
+            "role_profile_name": "Lead User",
+            "enabled": 1
+        }
+    )
+    
+    # Count all Sales Orders
+    sales_orders_count = frappe.db.count("Sales Order")
+    
+    return {
+        "leads": leads_count,
+        "leadManagers": lead_managers_count,
+        "leadUsers": lead_users_count,
+        "salesOrders": sales_orders_count
+    }
+
+
 @frappe.whitelist()
+@cached_report(depends_on=["Lead", "Sales Order"])
 def get_statistics():
     """
     Get statistics counts for dashboard
@@ -206,36 +210,7 @@ def get_statistics():
         dict: Statistics data with counts for leads, lead managers, lead users, and sales orders
     """
     try:
-        # Count all Leads
-        leads_count = frappe.db.count("Lead")
-        
-        # Count Lead Managers (Users with role_profile_name = "Lead Manager")
-        lead_managers_count = frappe.db.count(
-            "User",
-            filters={
-                "role_profile_name": "Lead Manager",
-                "enabled": 1
-            }
-        )
-        
-        # Count Lead Users (Users with role_profile_name = "Lead User")
-        lead_users_count = frappe.db.count(
-            "User",
-            filters={
-                "role_profile_name": "Lead User",
-                "enabled": 1
-            }
-        )
-        
-        # Count all Sales Orders
-        sales_orders_count = frappe.db.count("Sales Order")
-        
-        statistics = {
-            "leads": leads_count,
-            "leadManagers": lead_managers_count,
-            "leadUsers": lead_users_count,
-            "salesOrders": sales_orders_count
-        }
+        statistics = build_statistics()
         
         create_response(200, "Statistics fetched successfully", statistics)
         
@@ -248,6 +223,7 @@ def get_statistics():
 
 
 @frappe.whitelist()
+@cached_report(depends_on=["Lead", "Sales Order"])
 def get_sales_target_summary():
     """
     Get sales target summary with today's deals, revenue, and detailed agent performance
@@ -350,4 +326,175 @@ def get_sales_target_summary():
             f"Error fetching sales target summary: {str(e)}",
             "Sales Target Summary Error"
         )
-        create_response(500, f"Error fetching sales target summary: {str(e)}", None)
\ No newline at end of file
+        create_response(500, f"Error fetching sales target summary: {str(e)}", None)
+
+
+def update_sales_rollup_for_lead(doc, method):
+    """
+    Keep Sales Daily Rollup current when a Lead is created, reassigned or deleted
+
+    Both the previous and the current (agent, day) buckets are refreshed so a
+    reassignment moves the lead from one agent's count to the other.
+    """
+    try:
+        # on_update_lead may have just assigned the agent with db.set_value, which doesn't touch doc
+        agent = doc.get("custom_assigned_user")
+        if method != "after_delete":
+            agent = frappe.db.get_value("Lead", doc.name, "custom_assigned_user")
+
+        buckets = {(agent, getdate(doc.creation))}
+        doc_before = doc.get_doc_before_save()
+        if doc_before:
+            buckets.add((doc_before.get("custom_assigned_user"), getdate(doc_before.creation)))
+
+        for agent, day in buckets:
+            refresh_bucket(agent, day)
+    except Exception as e:
+        frappe.log_error(
+            f"Error updating sales rollup for Lead {doc.name}: {str(e)}",
+            "Sales Rollup Error"
+        )
+
+
+def update_sales_rollup_for_sales_order(doc, method):
+    """
+    Keep Sales Daily Rollup current when a Sales Order is saved, submitted, cancelled or deleted
+    """
+    try:
+        buckets = {(doc.get("custom_agent"), doc.get("transaction_date"))}
+        doc_before = doc.get_doc_before_save()
+        if doc_before:
+            buckets.add((doc_before.get("custom_agent"), doc_before.get("transaction_date")))
+
+        for agent, day in buckets:
+            refresh_bucket(agent, day)
+    except Exception as e:
+        frappe.log_error(
+            f"Error updating sales rollup for Sales Order {doc.name}: {str(e)}",
+            "Sales Rollup Error"
+        )
+
+
+@frappe.whitelist()
+@cached_report(depends_on=["Lead", "Sales Order"])
+def get_sales_timeseries():
+    """
+    Get leads created, deals and revenue per period and agent over a date range
+
+    Served from Sales Daily Rollup, so a 12-month chart reads a few hundred
+    pre-bucketed rows through the (rollup_date, agent) index instead of
+    scanning Lead and Sales Order.
+
+    Parameters:
+        from_date (str): Start of the range, defaults to 12 months ago
+        to_date (str): End of the range (inclusive), defaults to today
+        granularity (str): "day", "week" (Monday start) or "month", defaults to "day"
+        agent (str): Optional user to restrict the series to
+
+    Returns:
+        dict: Rows of period, agent, leads, deals and revenue ordered by period
+    """
+    try:
+        to_date = getdate(frappe.local.form_dict.get("to_date") or today())
+        from_date = getdate(frappe.local.form_dict.get("from_date") or add_months(to_date, -12))
+        granularity = frappe.local.form_dict.get("granularity") or "day"
+        agent = frappe.local.form_dict.get("agent")
+
+        period_expressions = {
+            "day": "rollup_date",
+            "week": "DATE_SUB(rollup_date, INTERVAL WEEKDAY(rollup_date) DAY)",
+            "month": "DATE_FORMAT(rollup_date, '%%Y-%%m-01')",
+        }
+        if granularity not in period_expressions:
+            create_response(400, "Granularity must be one of day, week or month", None)
+            return
+
+        if from_date > to_date:
+            create_response(400, "From date must be before to date", None)
+            return
+
+        conditions = "rollup_date BETWEEN %(from_date)s AND %(to_date)s"
+        values = {"from_date": from_date, "to_date": to_date}
+        if agent:
+            conditions += " AND agent = %(agent)s"
+            values["agent"] = agent
+
+        rows = frappe.db.sql(
+            f"""
+            SELECT
+                {period_expressions[granularity]} AS period,
+                agent,
+                SUM(leads_created) AS leads,
+                SUM(deals) AS deals,
+                SUM(revenue) AS revenue
+            FROM `tabSales Daily Rollup`
+            WHERE {conditions}
+            GROUP BY period, agent
+            ORDER BY period, agent
+            """,
+            values,
+            as_dict=True
+        )
+
+        series = [
+            {
+                "period": str(getdate(row.period)),
+                "agent": row.agent or None,
+                "leads": int(row.leads or 0),
+                "deals": int(row.deals or 0),
+                "revenue": round(float(row.revenue or 0), 2)
+            }
+            for row in rows
+        ]
+
+        create_response(200, "Sales timeseries fetched successfully", {
+            "from_date": str(from_date),
+            "to_date": str(to_date),
+            "granularity": granularity,
+            "series": series
+        })
+
+    except Exception as e:
+        frappe.log_error(
+            f"Error fetching sales timeseries: {str(e)}",
+            "Sales Timeseries Error"
+        )
+        create_response(500, f"Error fetching sales timeseries: {str(e)}", None)
+
+
+@frappe.whitelist()
+def rebuild_sales_rollup(from_date=None, to_date=None):
+    """
+    Queue a rebuild of Sales Daily Rollup for a date range (System Manager only)
+
+    Parameters:
+        from_date (str): Start of the range, defaults to the earliest Lead or Sales Order
+        to_date (str): End of the range (inclusive), defaults to today
+    """
+    frappe.only_for("System Manager")
+
+    frappe.enqueue(
+        "erptech_lead.api.hooks.rebuild_sales_rollup_job",
+        queue="long",
+        from_date=from_date,
+        to_date=to_date
+    )
+    create_response(200, "Sales rollup rebuild queued", None)
+
+
+def rebuild_sales_rollup_job(from_date=None, to_date=None):
+    """Rebuild Sales Daily Rollup month by month to keep each transaction short"""
+    to_date = getdate(to_date or today())
+    if not from_date:
+        first_lead = frappe.db.sql("SELECT MIN(creation) FROM `tabLead`")[0][0]
+        first_order = frappe.db.sql("SELECT MIN(transaction_date) FROM `tabSales Order`")[0][0]
+        candidates = [getdate(d) for d in (first_lead, first_order) if d]
+        from_date = min(candidates) if candidates else to_date
+    from_date = getdate(from_date)
+
+    chunk_start = from_date
+    while chunk_start <= to_date:
+        chunk_end = min(add_days(add_months(chunk_start, 1), -1), to_date)
+        rebuild_rollup(chunk_start, chunk_end)
+        frappe.db.commit()
+        chunk_start = add_days(chunk_end, 1)
@@ -0,0 +1,509 @@
+"""
+Legal Case APIs for My Lead
+"""
+import frappe
+import json
+import re
+from frappe.model.db_query import DatabaseQuery
+from frappe.utils import add_days, add_months, cint, date_diff, flt, getdate, today
+from erptech_lead.api.utils import create_response
+from erptech_lead.my_lead.doctype.legal_case_link.legal_case_link import get_connected_cases
+from erptech_lead.my_lead.doctype.legal_party.legal_party import find_party_matches, get_name_key
+
+
+@frappe.whitelist()
+def get_activity_log():
+    """
+    Get the activity log of a Legal case, newest first, without loading the case
+
+    Parameters:
+        legal (str): Legal document name
+        page (int): Page number, defaults to 1
+        page_length (int): Rows per page, defaults to 20
+
+    Returns:
+        dict: counts and data (user, activity_time, action, changes)
+    """
+    try:
+        legal = frappe.local.form_dict.get("legal")
+        page = max(cint(frappe.local.form_dict.get("page")) or 1, 1)
+        page_length = min(cint(frappe.local.form_dict.get("page_length")) or 20, 500)
+
+        if not legal:
+            create_response(400, "Legal is required", {})
+            return
+
+        if not frappe.has_permission("Legal", "read", legal):
+            create_response(403, f"Not permitted to read Legal {legal}", {})
+            return
+
+        counts = frappe.db.count("Legal Activity Log", {"legal": legal})
+        rows = frappe.get_all(
+            "Legal Activity Log",
+            filters={"legal": legal},
+            fields=["user", "activity_time", "action", "changes"],
+            order_by="activity_time desc, creation desc",
+            start=(page - 1) * page_length,
+            limit_page_length=page_length,
+        )
+        for row in rows:
+            row.changes = json.loads(row.changes) if row.changes else None
+
+        create_response(
+            200,
+            "Activity log fetched successfully",
+            {"counts": counts, "data": rows},
+        )
+
+    except Exception as ex:
+        frappe.log_error(frappe.get_traceback(), "Error in fetching Legal activity log")
+        create_response(500, f"Error fetching activity log: {str(ex)}", {})
+
+
+# Characters of context shown on each side of the first match in a search snippet
+SNIPPET_CONTEXT = 80
+
+# Widest window get_calendar accepts, in days
+MAX_CALENDAR_WINDOW = 366
+
+# Period expressions and groupable dimensions of get_legal_spend
+SPEND_PERIODS = {
+    "day": "rollup_date",
+    "week": "DATE_SUB(rollup_date, INTERVAL WEEKDAY(rollup_date) DAY)",
+    "month": "DATE_FORMAT(rollup_date, '%%Y-%%m-01')",
+}
+SPEND_DIMENSIONS = ("property_id", "budget_head")
+
+# Limits of the case graph walk
+MAX_GRAPH_DEPTH = 5
+MAX_GRAPH_NODES = 200
+
+
+@frappe.whitelist()
+def get_calendar():
+    """
+    Get hearings and deadlines of Legal cases and Legal Plots in a date window
+
+    Reads the indexed Legal Calendar Event table, so no Legal or Legal Plot
+    rows are scanned.
+
+    Parameters:
+        from_date (str): Window start, defaults to today
+        to_date (str): Window end, defaults to 30 days after from_date
+        advocate (str): Optional advocate filter
+        court (str): Optional court filter
+        property_id (str): Optional Plot Detail filter
+        event_type (str): Optional event type filter, e.g. "Hearing"
+        source_doctype (str): Optional "Legal" or "Legal Plot"
+        page (int): Page number, defaults to 1
+        page_length (int): Rows per page, defaults to 100
+
+    Returns:
+        dict: counts and data (event_date, event_type, source_doctype,
+        source_name, advocate, court, property_id), earliest first
+    """
+    try:
+        form_dict = frappe.local.form_dict
+        from_date = getdate(form_dict.get("from_date") or today())
+        to_date = getdate(form_dict.get("to_date") or add_days(from_date, 30))
+        page = max(cint(form_dict.get("page")) or 1, 1)
+        page_length = min(cint(form_dict.get("page_length")) or 100, 500)
+
+        if to_date < from_date:
+            create_response(400, "to_date must not be before from_date", {})
+            return
+        if date_diff(to_date, from_date) > MAX_CALENDAR_WINDOW:
+            create_response(400, f"Date window cannot exceed {MAX_CALENDAR_WINDOW} days", {})
+            return
+
+        filters = [["event_date", "between", [from_date, to_date]]]
+        for fieldname in ("advocate", "court", "property_id", "event_type", "source_doctype"):
+            if form_dict.get(fieldname):
+                filters.append([fieldname, "=", form_dict.get(fieldname)])
+
+        counts = frappe.get_list(
+            "Legal Calendar Event", filters=filters, fields=["count(name) as count"]
+        )[0].count
+        rows = frappe.get_list(
+            "Legal Calendar Event",
+            filters=filters,
+            fields=[
+                "event_date", "event_type", "source_doctype", "source_name",
+                "advocate", "court", "property_id",
+            ],
+            order_by="event_date asc, source_name asc",
+            start=(page - 1) * page_length,
+            limit_page_length=page_length,
+        )
+
+        create_response(
+            200,
+            "Calendar fetched successfully",
+            {"counts": counts, "data": rows},
+        )
+
+    except Exception as ex:
+        frappe.log_error(frappe.get_traceback(), "Error in fetching Legal calendar")
+        create_response(500, f"Error fetching calendar: {str(ex)}", {})
+
+
+def get_snippet(content, terms):
+    """Text around the first occurrence of any search term, or the start of the content"""
+    content = content or ""
+    match = None
+    if terms:
+        match = re.search("|".join(re.escape(term) for term in terms), content, re.IGNORECASE)
+    if not match:
+        return content[: SNIPPET_CONTEXT * 2] + ("..." if len(content) > SNIPPET_CONTEXT * 2 else "")
+
+    start = max(match.start() - SNIPPET_CONTEXT, 0)
+    end = min(match.end() + SNIPPET_CONTEXT, len(content))
+    return ("..." if start else "") + content[start:end] + ("..." if end < len(content) else "")
+
+
+@frappe.whitelist()
+def search_cases():
+    """
+    Full-text search over Legal case narratives, best match first
+
+    Searches allegations, case summary, advocate notes, sections invoked and
+    last order summary through the FULLTEXT index on Legal Search Index.
+    Results are limited to the cases the user may read.
+
+    Parameters:
+        query (str): Search text
+        page (int): Page number, defaults to 1
+        page_length (int): Rows per page, defaults to 20
+
+    Returns:
+        dict: counts and data (legal, score, snippet, fir_case_number,
+        complainant_name, stage_of_case)
+    """
+    try:
+        query = (frappe.local.form_dict.get("query") or "").strip()
+        page = max(cint(frappe.local.form_dict.get("page")) or 1, 1)
+        page_length = min(cint(frappe.local.form_dict.get("page_length")) or 20, 100)
+
+        if not query:
+            create_response(400, "Query is required", {})
+            return
+
+        if not frappe.has_permission("Legal", "read"):
+            create_response(403, "Not permitted to read Legal", {})
+            return
+
+        # User permission / if_owner restrictions, written against `tabLegal`
+        match_conditions = DatabaseQuery("Legal").build_match_conditions()
+        condition = f"AND {match_conditions}" if match_conditions else ""
+        values = {"query": query, "start": (page - 1) * page_length, "page_length": page_length}
+
+        counts = frappe.db.sql(
+            f"""
+            SELECT COUNT(*)
+            FROM `tabLegal Search Index` idx
+            INNER JOIN `tabLegal` ON `tabLegal`.name = idx.legal
+            WHERE MATCH(idx.content) AGAINST (%(query)s IN NATURAL LANGUAGE MODE)
+            {condition}
+            """,
+            values,
+        )[0][0]
+
+        rows = frappe.db.sql(
+            f"""
+            SELECT
+                idx.legal,
+                MATCH(idx.content) AGAINST (%(query)s IN NATURAL LANGUAGE MODE) AS score,
+                idx.content,
+                `tabLegal`.fir_case_number,
+                `tabLegal`.complainant_name,
+                `tabLegal`.stage_of_case
+            FROM `tabLegal Search Index` idx
+            INNER JOIN `tabLegal` ON `tabLegal`.name = idx.legal
+            WHERE MATCH(idx.content) AGAINST (%(query)s IN NATURAL LANGUAGE MODE)
+            {condition}
+            ORDER BY score DESC, idx.legal ASC
+            LIMIT %(start)s, %(page_length)s
+            """,
+            values,
+            as_dict=True,
+        )
+
+        terms = [term for term in re.split(r"\W+", query) if len(term) > 2]
+        for row in rows:
+            row.snippet = get_snippet(row.pop("content"), terms)
+
+        create_response(
+            200,
+            "Cases fetched successfully",
+            {"counts": counts, "data": rows},
+        )
+
+    except Exception as ex:
+        frappe.log_error(frappe.get_traceback(), "Error in searching Legal cases")
+        create_response(500, f"Error searching cases: {str(ex)}", {})
+
+
+def get_readable_cases(legals):
+    """Subset of the given Legal names the user may read, with a few summary fields"""
+    if not legals:
+        return {}
+    rows = frappe.get_list(
+        "Legal",
+        filters={"name": ["in", list(legals)]},
+        fields=["name", "fir_case_number", "complainant_name", "stage_of_case"],
+        limit_page_length=len(legals),
+    )
+    return {row.name: row for row in rows}
+
+
+@frappe.whitelist()
+def get_party_cases():
+    """
+    Get every Legal case a person or organisation appears in
+
+    Names are matched on a normalized key (case, spacing, titles, word order
+    and common transliteration variants are ignored) through the Legal Party
+    index.
+
+    Parameters:
+        party_name (str): Name to look up
+        father_name (str): Optional, narrows accused matches
+        party_type (str): Optional "Accused", "Complainant" or "Organisation"
+
+    Returns:
+        dict: name_key and data (case fields plus the matched party rows per case)
+    """
+    try:
+        party_name = frappe.local.form_dict.get("party_name")
+        father_name = frappe.local.form_dict.get("father_name")
+        party_type = frappe.local.form_dict.get("party_type")
+
+        if not get_name_key(party_name):
+            create_response(400, "Party name is required", {})
+            return
+
+        matches = find_party_matches([{"party_name": party_name, "father_name": father_name}])[0]["matches"]
+        if party_type:
+            matches = [row for row in matches if row.party_type == party_type]
+
+        cases = get_readable_cases({row.legal for row in matches})
+        data = []
+        for legal, case in cases.items():
+            case.parties = [
+                {"party_type": row.party_type, "party_name": row.party_name, "father_name": row.father_name}
+                for row in matches if row.legal == legal
+            ]
+            data.append(case)
+        data.sort(key=lambda case: case.name, reverse=True)
+
+        create_response(
+            200,
+            "Party cases fetched successfully",
+            {"name_key": get_name_key(party_name), "data": data},
+        )
+
+    except Exception as ex:
+        frappe.log_error(frappe.get_traceback(), "Error in fetching party cases")
+        create_response(500, f"Error fetching party cases: {str(ex)}", {})
+
+
+@frappe.whitelist()
+def check_duplicate_parties():
+    """
+    Check parties being entered on a case against all other cases
+
+    Parameters:
+        parties (list|str): [{"party_name": ..., "father_name": ...}]
+        legal (str): Optional name of the case being edited, excluded from matches
+
+    Returns:
+        dict: One entry per party with the readable cases it already appears in
+        and the count of matching cases the user can't read
+    """
+    try:
+        parties = frappe.local.form_dict.get("parties") or []
+        if isinstance(parties, str):
+            parties = json.loads(parties) if parties else []
+        legal = frappe.local.form_dict.get("legal")
+
+        results = find_party_matches(parties, exclude_legal=legal)
+        cases = get_readable_cases({row.legal for result in results for row in result["matches"]})
+
+        data = []
+        for result in results:
+            legals = sorted({row.legal for row in result["matches"]}, reverse=True)
+            data.append({
+                "party_name": result.get("party_name"),
+                "father_name": result.get("father_name"),
+                "cases": [cases[name] for name in legals if name in cases],
+                "restricted_count": len([name for name in legals if name not in cases]),
+            })
+
+        create_response(200, "Duplicate parties checked successfully", data)
+
+    except Exception as ex:
+        frappe.log_error(frappe.get_traceback(), "Error in checking duplicate parties")
+        create_response(500, f"Error checking duplicate parties: {str(ex)}", {})
+
+
+@frappe.whitelist()
+def get_case_graph():
+    """
+    Get the cluster of cases linked to a Legal case
+
+    Follows Linked Counter-Cases and the accused's Linked Case IDs in both
+    directions, one indexed query per level of Legal Case Link.
+
+    Parameters:
+        legal (str): Legal document name
+        depth (int): Levels to follow, defaults to 2 (max 5)
+
+    Returns:
+        dict: nodes (case fields and depth; cases the user can't read are
+        marked restricted), edges (source, target, link type, reference;
+        target is empty for references to unknown cases) and truncated
+    """
+    try:
+        legal = frappe.local.form_dict.get("legal")
+        depth = min(max(cint(frappe.local.form_dict.get("depth")) or 2, 1), MAX_GRAPH_DEPTH)
+
+        if not legal:
+            create_response(400, "Legal is required", {})
+            return
+
+        if not frappe.has_permission("Legal", "read", legal):
+            create_response(403, f"Not permitted to read Legal {legal}", {})
+            return
+
+        depths, edges, truncated = get_connected_cases(legal, depth, MAX_GRAPH_NODES)
+        cases = get_readable_cases(set(depths))
+
+        nodes = []
+        for name, node_depth in sorted(depths.items(), key=lambda item: (item[1], item[0])):
+            node = cases.get(name) or frappe._dict(name=name, restricted=True)
+            node.depth = node_depth
+            nodes.append(node)
+
+        create_response(
+            200,
+            "Case graph fetched successfully",
+            {
+                "nodes": nodes,
+                "edges": [
+                    {
+                        "source": edge.source_legal,
+                        "target": edge.target_legal,
+                        "link_type": edge.link_type,
+                        "accused_name": edge.accused_name,
+                        "reference": edge.reference,
+                    }
+                    for edge in edges
+                ],
+                "truncated": truncated,
+            },
+        )
+
+    except Exception as ex:
+        frappe.log_error(frappe.get_traceback(), "Error in fetching Legal case graph")
+        create_response(500, f"Error fetching case graph: {str(ex)}", {})
+
+
+@frappe.whitelist()
+def get_legal_spend():
+    """
+    Get Legal Plot spend and activity counts by period, property and budget head
+
+    Served from Legal Spend Rollup, which Legal Plot keeps current on save,
+    so dashboards read pre-bucketed rows instead of the Legal Plot table.
+
+    Parameters:
+        from_date (str): Start of the range, defaults to 12 months ago
+        to_date (str): End of the range (inclusive), defaults to today
+        granularity (str): "day", "week" (Monday start), "month" or "none", defaults to "month"
+        group_by (str): Comma separated dimensions, any of property_id and budget_head
+        property_id (str): Optional property filter
+        budget_head (str): Optional budget head filter
+
+    Returns:
+        dict: Rows of period and the grouped dimensions with amount_paid,
+        fee_paid, legal_spend_today, entries, new_cases_filed,
+        orders_received and revenue_approvals_received, plus totals
+    """
+    try:
+        form_dict = frappe.local.form_dict
+        to_date = getdate(form_dict.get("to_date") or today())
+        from_date = getdate(form_dict.get("from_date") or add_months(to_date, -12))
+        granularity = form_dict.get("granularity") or "month"
+        group_by = [dimension.strip() for dimension in (form_dict.get("group_by") or "").split(",") if dimension.strip()]
+
+        if not frappe.has_permission("Legal Plot", "read"):
+            create_response(403, "Not permitted to read Legal Plot", None)
+            return
+
+        if granularity != "none" and granularity not in SPEND_PERIODS:
+            create_response(400, "Granularity must be one of day, week, month or none", None)
+            return
+
+        unknown = [dimension for dimension in group_by if dimension not in SPEND_DIMENSIONS]
+        if unknown:
+            create_response(400, f"Cannot group by {', '.join(unknown)}", None)
+            return
+
+        if from_date > to_date:
+            create_response(400, "From date must be before to date", None)
+            return
+
+        conditions = "rollup_date BETWEEN %(from_date)s AND %(to_date)s"
+        values = {"from_date": from_date, "to_date": to_date}
+        for dimension in SPEND_DIMENSIONS:
+            if form_dict.get(dimension):
+                conditions += f" AND {dimension} = %({dimension})s"
+                values[dimension] = form_dict.get(dimension)
+
+        columns = (["period"] if granularity != "none" else []) + group_by
+        select = [f"{SPEND_PERIODS[granularity]} AS period"] if granularity != "none" else []
+        select += group_by
+        group_clause = f"GROUP BY {', '.join(columns)} ORDER BY {', '.join(columns)}" if columns else ""
+
+        rows = frappe.db.sql(
+            f"""
+            SELECT
+                {"".join(f"{column}, " for column in select)}
+                SUM(amount_paid) AS amount_paid,
+                SUM(fee_paid) AS fee_paid,
+                SUM(legal_spend_today) AS legal_spend_today,
+                SUM(entries) AS entries,
+                SUM(new_cases_filed) AS new_cases_filed,
+                SUM(orders_received) AS orders_received,
+                SUM(revenue_approvals_received) AS revenue_approvals_received
+            FROM `tabLegal Spend Rollup`
+            WHERE {conditions}
+            {group_clause}
+            """,
+            values,
+            as_dict=True
+        )
+
+        totals = {}
+        for row in rows:
+            if row.get("period"):
+                row.period = str(getdate(row.period))
+            for fieldname in ("amount_paid", "fee_paid", "legal_spend_today"):
+                row[fieldname] = flt(row[fieldname], 2)
+                totals[fieldname] = flt(totals.get(fieldname, 0) + row[fieldname], 2)
+            for fieldname in ("entries", "new_cases_filed", "orders_received", "revenue_approvals_received"):
+                row[fieldname] = cint(row[fieldname])
+                totals[fieldname] = totals.get(fieldname, 0) + row[fieldname]
+
+        create_response(200, "Legal spend fetched successfully", {
+            "from_date": str(from_date),
+            "to_date": str(to_date),
+            "granularity": granularity,
+            "group_by": group_by,
+            "data": rows,
+            "totals": totals
+        })
+
+    except Exception as ex:
+        frappe.log_error(frappe.get_traceback(), "Error in fetching Legal spend")
+        create_response(500, f"Error fetching Legal spend: {str(ex)}", None)
@@ -0,0 +1,360 @@
+"""
+Plot Detail (inventory) APIs for My Lead
+"""
+import frappe
+import json
+from frappe.utils import cint, flt, getdate, now, today
+from erptech_lead.api.utils import create_response
+
+# Columns of the inventory index, in index order
+INVENTORY_DIMENSIONS = ("project_layout_name", "plot_status", "plot_type", "facing")
+
+# Plots repriced by default; sold plots keep the price they were sold at
+REPRICE_STATUSES = ("", "Available", "Booked")
+REPRICE_BATCH_SIZE = 500
+
+# New values at %(rate)s, shared by the repricing plan and the UPDATE so both round the same way
+REPRICE_TOTAL_SQL = "ROUND(plot_size_sqft * %(rate)s, 2)"
+REPRICE_BALANCE_SQL = f"GREATEST({REPRICE_TOTAL_SQL} - IFNULL(paid_amount, 0), 0)"
+REPRICE_SCOPE_SQL = "project_layout_name = %(layout)s AND IFNULL(plot_status, '') IN %(statuses)s"
+
+
+@frappe.whitelist()
+def get_inventory_summary():
+    """
+    Get plot counts and value totals per layout and status in one call
+
+    Grouped through the (project_layout_name, plot_status, plot_type, facing,
+    total_plot_value) index, so no Plot Detail rows are read beyond the index.
+    User permissions on Plot Detail are applied.
+
+    Parameters:
+        project_layout_name (str): Optional layout filter
+        plot_status (str): Optional status filter (Available, Booked, Sold)
+        plot_type (str): Optional type filter (Residential, Commercial)
+        facing (str): Optional facing filter
+        breakdown (int): Include per type/facing groups for each layout, defaults to 1
+
+    Returns:
+        dict: layouts (count, total_value, statuses {status: {count, total_value}},
+        and groups of plot_status, plot_type, facing, count, total_value) and totals
+    """
+    try:
+        form_dict = frappe.local.form_dict
+        breakdown = cint(form_dict.get("breakdown") if form_dict.get("breakdown") is not None else 1)
+        filters = {dimension: form_dict.get(dimension) for dimension in INVENTORY_DIMENSIONS if form_dict.get(dimension)}
+
+        if not frappe.has_permission("Plot Detail", "read"):
+            create_response(403, "Not permitted to read Plot Detail", None)
+            return
+
+        group_by = list(INVENTORY_DIMENSIONS if breakdown else INVENTORY_DIMENSIONS[:2])
+        rows = frappe.get_list(
+            "Plot Detail",
+            filters=filters,
+            fields=[*group_by, "count(name) as count", "sum(total_plot_value) as total_value"],
+            group_by=", ".join(group_by),
+            order_by=", ".join(group_by),
+            limit_page_length=0,
+        )
+
+        layouts = {}
+        totals = {"count": 0, "total_value": 0.0, "statuses": {}}
+        for row in rows:
+            count, total_value = cint(row.count), flt(row.total_value, 2)
+            status = row.plot_status or "Not Set"
+            layout = layouts.setdefault(row.project_layout_name or "", {
+                "project_layout_name": row.project_layout_name,
+                "count": 0,
+                "total_value": 0.0,
+                "statuses": {},
+                "groups": [],
+            })
+
+            for summary in (layout, totals):
+                summary["count"] += count
+                summary["total_value"] = flt(summary["total_value"] + total_value, 2)
+                bucket = summary["statuses"].setdefault(status, {"count": 0, "total_value": 0.0})
+                bucket["count"] += count
+                bucket["total_value"] = flt(bucket["total_value"] + total_value, 2)
+
+            if breakdown:
+                layout["groups"].append({
+                    "plot_status": row.plot_status,
+                    "plot_type": row.plot_type,
+                    "facing": row.facing,
+                    "count": count,
+                    "total_value": total_value,
+                })
+
+        if not breakdown:
+            for layout in layouts.values():
+                layout.pop("groups")
+
+        create_response(200, "Inventory summary fetched successfully", {
+            "layouts": list(layouts.values()),
+            "totals": totals
+        })
+
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), "Error in fetching inventory summary")
+        create_response(500, f"Error fetching inventory summary: {str(e)}", None)
+
+
+@frappe.whitelist()
+def book_plot():
+    """
+    Book an Available plot, safely under concurrent requests
+
+    The plot row alone is locked with SELECT ... FOR UPDATE NOWAIT, so a
+    second agent booking the same plot gets an immediate 409 instead of
+    waiting or overwriting, and bookings of other plots are not blocked.
+    Booking fields and balance_amount are written in the same transaction.
+
+    Parameters:
+        plot (str): Plot Detail name
+        booking_amount (float): Amount received at booking
+        paid_amount (float): Optional total paid so far, defaults to the
+            current paid amount plus booking_amount
+        booking_date (str): Optional, defaults to today
+        lead (str): Optional Lead the plot is booked for
+        agent_reference_name (str): Optional
+        payment_mode (str): Optional
+        payment_date (str): Optional
+
+    Returns:
+        dict: name, plot_status, booking_date, booking_amount, paid_amount,
+        balance_amount (409 when the plot is not Available or is being booked)
+    """
+    try:
+        form_dict = frappe.local.form_dict
+        plot = form_dict.get("plot")
+        booking_amount = flt(form_dict.get("booking_amount"))
+
+        if not plot:
+            create_response(400, "Plot is required", None)
+            return
+
+        if booking_amount < 0 or flt(form_dict.get("paid_amount")) < 0:
+            create_response(400, "Amounts cannot be negative", None)
+            return
+
+        if form_dict.get("lead") and not frappe.db.exists("Lead", form_dict.get("lead")):
+            create_response(400, f"Lead {form_dict.get('lead')} not found", None)
+            return
+
+        if not frappe.db.exists("Plot Detail", plot):
+            create_response(404, f"Plot {plot} not found", None)
+            return
+
+        if not frappe.has_permission("Plot Detail", "write", plot):
+            create_response(403, f"Not permitted to book {plot}", None)
+            return
+
+        try:
+            row = frappe.db.sql(
+                """
+                SELECT name, plot_status, total_plot_value, paid_amount
+                FROM `tabPlot Detail`
+                WHERE name = %(plot)s
+                FOR UPDATE NOWAIT
+                """,
+                {"plot": plot},
+                as_dict=True,
+            )
+        except (frappe.QueryTimeoutError, frappe.QueryDeadlockError):
+            frappe.db.rollback()
+            create_response(409, f"Plot {plot} is being booked by someone else", None)
+            return
+
+        if not row:
+            create_response(404, f"Plot {plot} not found", None)
+            return
+
+        row = row[0]
+        if row.plot_status != "Available":
+            frappe.db.rollback()
+            create_response(409, f"Plot {plot} is already {row.plot_status or 'unavailable'}", {
+                "name": plot,
+                "plot_status": row.plot_status
+            })
+            return
+
+        paid_amount = (
+            flt(form_dict.get("paid_amount"))
+            if form_dict.get("paid_amount") not in (None, "")
+            else flt(row.paid_amount) + booking_amount
+        )
+        booking = {
+            "plot_status": "Booked",
+            "booking_date": getdate(form_dict.get("booking_date") or today()),
+            "booking_amount": booking_amount,
+            "paid_amount": paid_amount,
+            "balance_amount": max(flt(row.total_plot_value) - paid_amount, 0),
+        }
+        for fieldname in ("lead", "agent_reference_name", "payment_mode", "payment_date"):
+            if form_dict.get(fieldname):
+                booking[fieldname] = form_dict.get(fieldname)
+
+        frappe.db.sql(
+            f"""
+            UPDATE `tabPlot Detail`
+            SET {", ".join(f"`{fieldname}` = %({fieldname})s" for fieldname in booking)},
+                modified = %(modified)s, modified_by = %(modified_by)s
+            WHERE name = %(plot)s AND plot_status = 'Available'
+            """,
+            {**booking, "plot": plot, "modified": now(), "modified_by": frappe.session.user},
+        )
+        # The raw UPDATE writes no Version, so leave the audit trail as a comment in the same transaction
+        frappe.get_doc("Plot Detail", plot).add_comment(
+            "Info",
+            f"Booked with booking amount {booking_amount}, paid {paid_amount}, balance {booking['balance_amount']}",
+        )
+        frappe.db.commit()
+
+        create_response(200, "Plot booked successfully", {"name": plot, **booking})
+
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), "Error in booking plot")
+        create_response(500, f"Error booking plot: {str(e)}", None)
+
+
+def get_reprice_plan(layout, rate, statuses):
+    """
+    Plots of a layout whose value changes at `rate`, and plots that can't be priced
+
+    The new values are computed by MariaDB with the same expressions the
+    UPDATE uses, from the numeric plot_size_sqft column; plots without a
+    parseable size are returned as skipped.
+    """
+    values = {"layout": layout, "rate": rate, "statuses": tuple(statuses)}
+    changed = frappe.db.sql(
+        f"""
+        SELECT
+            name, plot_status, plot_size_sqft,
+            total_plot_value AS old_total_plot_value, {REPRICE_TOTAL_SQL} AS total_plot_value,
+            balance_amount AS old_balance_amount, {REPRICE_BALANCE_SQL} AS balance_amount
+        FROM `tabPlot Detail`
+        WHERE {REPRICE_SCOPE_SQL}
+            AND plot_size_sqft > 0
+            AND (
+                IFNULL(rate_per_sqft, 0) != %(rate)s
+                OR IFNULL(total_plot_value, 0) != {REPRICE_TOTAL_SQL}
+                OR IFNULL(balance_amount, 0) != {REPRICE_BALANCE_SQL}
+            )
+        ORDER BY name
+        """,
+        values,
+        as_dict=True,
+    )
+    for row in changed:
+        for fieldname in ("plot_size_sqft", "old_total_plot_value", "total_plot_value", "old_balance_amount", "balance_amount"):
+            row[fieldname] = flt(row[fieldname])
+
+    skipped = frappe.db.sql_list(
+        f"""
+        SELECT name FROM `tabPlot Detail`
+        WHERE {REPRICE_SCOPE_SQL} AND IFNULL(plot_size_sqft, 0) <= 0
+        ORDER BY name
+        """,
+        values,
+    )
+    return changed, skipped
+
+
+@frappe.whitelist()
+def reprice_layout():
+    """
+    Apply a new rate per sq ft to every plot of a layout (System Manager / Lead Manager)
+
+    total_plot_value and balance_amount are recomputed set-wise in SQL, one
+    UPDATE and commit per batch of 500 plots, so a layout of thousands of
+    plots reprices in seconds without a save per plot.
+
+    Parameters:
+        project_layout_name (str): Layout to reprice
+        rate_per_sqft (float): New rate
+        plot_statuses (list|str): Optional statuses to reprice, defaults to
+            Available, Booked and unset (Sold plots are left alone)
+        dry_run (int): Report the changes without writing them
+
+    Returns:
+        dict: changed (name, old and new total_plot_value and balance_amount),
+        changed_count, updated_count (rows actually written, lower when plots
+        changed status meanwhile), skipped (plots without a parseable size)
+    """
+    frappe.only_for(("System Manager", "Lead Manager"))
+
+    try:
+        form_dict = frappe.local.form_dict
+        layout = form_dict.get("project_layout_name")
+        rate = flt(form_dict.get("rate_per_sqft"))
+        statuses = form_dict.get("plot_statuses")
+        if statuses is None:
+            statuses = REPRICE_STATUSES
+        if isinstance(statuses, str):
+            if statuses.startswith("["):
+                statuses = json.loads(statuses)
+            else:
+                statuses = [status.strip() for status in statuses.split(",") if status.strip()]
+        statuses = tuple(statuses or ())
+        dry_run = cint(form_dict.get("dry_run"))
+
+        if not layout:
+            create_response(400, "Project layout name is required", None)
+            return
+
+        if rate <= 0:
+            create_response(400, "Rate per sq ft must be greater than zero", None)
+            return
+
+        if not statuses:
+            create_response(400, "Plot statuses cannot be empty", None)
+            return
+
+        changed, skipped = get_reprice_plan(layout, rate, statuses)
+
+        updated_count = 0
+        if not dry_run:
+            timestamp = now()
+            for start in range(0, len(changed), REPRICE_BATCH_SIZE):
+                batch = [row["name"] for row in changed[start:start + REPRICE_BATCH_SIZE]]
+                frappe.db.sql(
+                    f"""
+                    UPDATE `tabPlot Detail`
+                    SET
+                        rate_per_sqft = %(rate)s,
+                        total_plot_value = {REPRICE_TOTAL_SQL},
+                        balance_amount = {REPRICE_BALANCE_SQL},
+                        modified = %(modified)s,
+                        modified_by = %(modified_by)s
+                    WHERE name IN %(names)s AND {REPRICE_SCOPE_SQL}
+                    """,
+                    {
+                        "rate": rate,
+                        "names": tuple(batch),
+                        "layout": layout,
+                        "statuses": statuses,
+                        "modified": timestamp,
+                        "modified_by": frappe.session.user,
+                    },
+                )
+                # Plots booked, sold or moved since the plan was read are left alone
+                updated_count += cint(frappe.db.sql("SELECT ROW_COUNT()")[0][0])
+                frappe.db.commit()
+
+        create_response(200, "Layout repriced successfully" if not dry_run else "Repricing preview", {
+            "project_layout_name": layout,
+            "rate_per_sqft": rate,
+            "dry_run": bool(dry_run),
+            "changed_count": len(changed),
+            "updated_count": updated_count,
+            "changed": changed,
+            "skipped": skipped
+        })
+
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), "Error in repricing layout")
+        create_response(500, f"Error repricing layout: {str(e)}", None)
@@ -0,0 +1,141 @@
+"""
+Token Bucket Rate Limiting for My Lead guest endpoints
+"""
+import frappe
+import functools
+import time
+from frappe.utils import cint, flt
+from erptech_lead.api.utils import create_response
+
+RATE_LIMIT_PREFIX = "erptech_lead:rate_limit"
+RATE_LIMIT_STATS = f"{RATE_LIMIT_PREFIX}:stats"
+
+# capacity: burst size, refill_per_minute: sustained rate. Override per bucket with
+# `erptech_lead_rate_limits` in site config, e.g. {"login": {"capacity": 20}}.
+# A capacity of 0 disables the bucket. "login" applies per IP and user, while
+# "login_ip" caps all logins from one IP, so raise "login_ip" for large offices
+# behind a single NAT.
+DEFAULT_RATE_LIMITS = {
+    "login": {"capacity": 10, "refill_per_minute": 5},
+    "login_ip": {"capacity": 100, "refill_per_minute": 60},
+    "forgot_password": {"capacity": 3, "refill_per_minute": 1},
+    "sign_up": {"capacity": 5, "refill_per_minute": 2},
+    "lead_capture": {"capacity": 30, "refill_per_minute": 20},
+}
+
+# Atomically refill the bucket for the elapsed time and take one token
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_per_second = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * refill_per_second)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / refill_per_second) + 1)
+return allowed
+"""
+
+
+def get_rate_limit(bucket):
+    limit = dict(DEFAULT_RATE_LIMITS.get(bucket) or {})
+    limit.update((frappe.conf.get("erptech_lead_rate_limits") or {}).get(bucket) or {})
+    return {
+        "capacity": cint(limit.get("capacity")),
+        "refill_per_minute": flt(limit.get("refill_per_minute")) or 1,
+    }
+
+
+def take_token(bucket, scope, identity):
+    """Take one token from the bucket for this scope/identity, returns False when empty"""
+    limit = get_rate_limit(bucket)
+    if limit["capacity"] <= 0 or not identity:
+        return True
+
+    cache = frappe.cache()
+    key = cache.make_key(f"{RATE_LIMIT_PREFIX}:{bucket}:{scope}:{str(identity).strip().lower()}")
+    script = cache.register_script(TOKEN_BUCKET_SCRIPT)
+    allowed = script(
+        keys=[key],
+        args=[limit["capacity"], limit["refill_per_minute"] / 60.0, time.time()],
+    )
+    return bool(allowed)
+
+
+def rate_limited(bucket, identity_param=None, ip_bucket=None):
+    """
+    Throttle a whitelisted endpoint per client IP and, optionally, per identity
+
+    `identity_param` names the request parameter (e.g. "usr", "email") that
+    gets its own bucket, so one account can't be hammered from many IPs.
+    With `ip_bucket`, the IP check is keyed on IP and identity together, so
+    users sharing an IP don't use up each other's tokens, and `ip_bucket`
+    sets a looser limit for the IP as a whole. Rejections return 429 before
+    the endpoint runs, so they cost a few Redis round trips and no database
+    work. Must be applied below `@frappe.whitelist()`.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            ip = frappe.local.request_ip
+            identity = None
+            if identity_param:
+                identity = kwargs.get(identity_param) or frappe.local.form_dict.get(identity_param)
+
+            if ip_bucket:
+                allowed = take_token(ip_bucket, "ip", ip) and take_token(
+                    bucket, "ip", f"{ip}:{identity or ''}"
+                )
+            else:
+                allowed = take_token(bucket, "ip", ip)
+            if allowed and identity_param:
+                allowed = take_token(bucket, "id", identity)
+
+            record_rate_limit_decision(bucket, allowed)
+            if not allowed:
+                create_response(429, "Too many requests, please try again later")
+                return
+
+            return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def record_rate_limit_decision(bucket, allowed):
+    cache = frappe.cache()
+    cache.hincrby(
+        cache.make_key(RATE_LIMIT_STATS), f"{bucket}:{'allowed' if allowed else 'rejected'}", 1
+    )
+
+
+@frappe.whitelist()
+def get_rate_limit_stats():
+    """
+    Get allowed/rejected counters and the effective limit for each bucket (System Manager only)
+
+    Returns:
+        dict: Per bucket capacity, refill_per_minute, allowed and rejected counts
+    """
+    frappe.only_for("System Manager")
+
+    cache = frappe.cache()
+    fields = [f"{bucket}:{decision}" for bucket in DEFAULT_RATE_LIMITS for decision in ("allowed", "rejected")]
+    counters = dict(zip(fields, cache.hmget(cache.make_key(RATE_LIMIT_STATS), fields), strict=True))
+
+    stats = {}
+    for bucket in DEFAULT_RATE_LIMITS:
+        stats[bucket] = {
+            **get_rate_limit(bucket),
+            "allowed": cint(counters.get(f"{bucket}:allowed")),
+            "rejected": cint(counters.get(f"{bucket}:rejected")),
+        }
+
+    create_response(200, "Rate limit stats fetched successfully", stats)
@@ -0,0 +1,161 @@
+"""
+Delta Sync ("changed since") API for offline PWA clients
+"""
+import frappe
+import json
+from datetime import datetime
+from frappe.utils import cint, get_datetime
+from erptech_lead.api.utils import create_response, timeOfZone
+
+# Doctypes clients may keep offline
+SYNC_DOCTYPES = ("Lead", "Plot Detail", "Legal", "Legal Plot", "Country", "State", "City")
+
+DEFAULT_SYNC_LIMIT = 500
+MAX_SYNC_LIMIT = 2000
+
+
+def get_changed_rows(doctype, watermark, fields, limit):
+    """
+    Rows modified after the (modified, name) watermark, oldest first
+
+    The watermark is compared as a pair so rows sharing a `modified`
+    timestamp are neither skipped nor repeated across pages. Permissions
+    are applied through frappe.get_list.
+    """
+    modified = watermark.get("modified")
+    name = watermark.get("name") or ""
+
+    rows = []
+    if modified:
+        # Remaining rows at the watermark timestamp
+        rows = frappe.get_list(
+            doctype,
+            filters=[["modified", "=", modified], ["name", ">", name]],
+            fields=fields,
+            order_by="name asc",
+            limit_page_length=limit + 1,
+        )
+
+    if len(rows) <= limit:
+        filters = [["modified", ">", modified]] if modified else []
+        rows += frappe.get_list(
+            doctype,
+            filters=filters,
+            fields=fields,
+            order_by="modified asc, name asc",
+            limit_page_length=limit + 1 - len(rows),
+        )
+
+    has_more = len(rows) > limit
+    return rows[:limit], has_more
+
+
+def get_deleted_names(doctype, watermark, limit):
+    """
+    Names deleted after the (deleted, deleted_name) watermark, with the watermark of the last one read
+
+    Like get_changed_rows, the Deleted Document creation time and name are
+    compared as a pair, so tombstones sharing a timestamp aren't skipped.
+    """
+    since = watermark.get("deleted")
+    since_name = watermark.get("deleted_name") or ""
+    fields = ["name", "deleted_name", "creation"]
+
+    deleted = []
+    if since:
+        # Remaining tombstones at the watermark timestamp
+        deleted = frappe.get_all(
+            "Deleted Document",
+            filters=[["deleted_doctype", "=", doctype], ["creation", "=", since], ["name", ">", since_name]],
+            fields=fields,
+            order_by="name asc",
+            limit_page_length=limit + 1,
+        )
+
+    if len(deleted) <= limit:
+        filters = [["deleted_doctype", "=", doctype]]
+        if since:
+            filters.append(["creation", ">", since])
+        deleted += frappe.get_all(
+            "Deleted Document",
+            filters=filters,
+            fields=fields,
+            order_by="creation asc, name asc",
+            limit_page_length=limit + 1 - len(deleted),
+        )
+
+    has_more = len(deleted) > limit
+    deleted = deleted[:limit]
+    last_deleted = {"deleted": str(deleted[-1].creation), "deleted_name": deleted[-1].name} if deleted else {}
+    return [row.deleted_name for row in deleted], last_deleted, has_more
+
+
+@frappe.whitelist()
+def changes():
+    """
+    Get rows changed or deleted since the client's per-doctype watermark
+
+    Parameters:
+        watermarks (dict|str): {doctype: watermark} as returned by the previous
+            call. A doctype with an empty watermark starts a full download.
+        fields (dict|str): Optional {doctype: [fieldnames]}, defaults to all fields
+        limit (int): Maximum changed and deleted rows per doctype, defaults to 500
+
+    Returns:
+        dict: Per doctype `changed` rows, `deleted` names, the new `watermark`
+        and `has_more` when another call is needed to catch up
+    """
+    try:
+        watermarks = frappe.local.form_dict.get("watermarks") or {}
+        fields_map = frappe.local.form_dict.get("fields") or {}
+        if isinstance(watermarks, str):
+            watermarks = json.loads(watermarks) if watermarks else {}
+        if isinstance(fields_map, str):
+            fields_map = json.loads(fields_map) if fields_map else {}
+        limit = min(cint(frappe.local.form_dict.get("limit")) or DEFAULT_SYNC_LIMIT, MAX_SYNC_LIMIT)
+
+        unknown = [doctype for doctype in watermarks if doctype not in SYNC_DOCTYPES]
+        if unknown:
+            create_response(400, f"Sync is not supported for {', '.join(unknown)}", None)
+            return
+
+        # Deleted Document is read without permission checks, so tombstones are
+        # only sent for doctypes the user can read
+        denied = [doctype for doctype in watermarks if not frappe.has_permission(doctype, "read")]
+        if denied:
+            create_response(403, f"Not permitted to sync {', '.join(denied)}", None)
+            return
+
+        result = {}
+        for doctype, watermark in watermarks.items():
+            if isinstance(watermark, str):
+                watermark = json.loads(watermark) if watermark else {}
+            watermark = watermark or {}
+            fields = fields_map.get(doctype) or ["*"]
+            if "*" not in fields:
+                fields = list({*fields, "name", "modified"})
+
+            changed, changed_more = get_changed_rows(doctype, watermark, fields, limit)
+            deleted, last_deleted, deleted_more = get_deleted_names(doctype, watermark, limit)
+
+            new_watermark = dict(watermark)
+            if changed:
+                new_watermark["modified"] = str(get_datetime(changed[-1].modified))
+                new_watermark["name"] = changed[-1].name
+            new_watermark.update(last_deleted)
+
+            result[doctype] = {
+                "changed": changed,
+                "deleted": deleted,
+                "watermark": new_watermark,
+                "has_more": changed_more or deleted_more,
+            }
+
+        create_response(200, "Changes fetched successfully", {
+            "time": timeOfZone(datetime.now()),
+            "doctypes": result
+        })
+
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), "Error in fetching sync changes")
+        create_response(500, f"Error fetching changes: {str(e)}", None)
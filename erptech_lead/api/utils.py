@@ -1,4 +1,7 @@
 import frappe
+import hashlib
+import json
+from frappe.utils import cint
 from pytz import timezone
 from datetime import datetime, timedelta
 
@@ -13,21 +16,91 @@ def timeOfZone(time):
     return utc_time.strftime("%Y-%m-%d %H:%M:%S.%f")
          
 
+LOCATION_CACHE_KEY = "erptech_lead:locations"
+
+# Parent link used to narrow each location list
+LOCATION_PARENT_FIELDS = {
+    "Country": None,
+    "State": "country",
+    "City": "state",
+}
+
+# Doctype each parent link points to
+LOCATION_PARENT_DOCTYPES = {
+    "State": "Country",
+    "City": "State",
+}
+
+def get_location_list(doctype, parent=None):
+    """
+    Names of a location doctype, optionally for one parent, served from Redis
+
+    Entries are built on first use with an exact-match query and dropped by
+    clear_location_cache when any Country, State or City changes. Only real
+    parents get an entry, so arbitrary `parent` strings can't grow the hash.
+    """
+    parent_field = LOCATION_PARENT_FIELDS[doctype]
+    parent = (parent or "") if parent_field else ""
+
+    def build():
+        filters = {parent_field: parent} if parent_field and parent else None
+        names = frappe.get_all(doctype, filters=filters, pluck="name", order_by="name asc")
+        data = [{"name": name} for name in names]
+        return {"etag": hashlib.md5(json.dumps(names).encode()).hexdigest(), "data": data}
+
+    cache = frappe.cache()
+    field = f"{doctype}:{parent}"
+    cached = cache.hget(LOCATION_CACHE_KEY, field)
+    if cached is not None:
+        return cached
+
+    # Parent is only checked on a miss, so hits stay free of database queries
+    result = build()
+    if not parent or frappe.db.exists(LOCATION_PARENT_DOCTYPES[doctype], parent):
+        cache.hset(LOCATION_CACHE_KEY, field, result)
+    return result
+
+def location_response(doctype, key, parent=None):
+    """
+    Send a location list, with optional `search` prefix filter and `limit` for typeahead
+
+    The response carries an `etag`; when the client sends it back (as `etag`
+    or an If-None-Match header) and nothing changed, a 304 without data is
+    returned.
+    """
+    cached = get_location_list(doctype, parent)
+    search = (frappe.local.form_dict.get("search") or "").strip().lower()
+    limit = cint(frappe.local.form_dict.get("limit"))
+
+    data = cached["data"]
+    etag = cached["etag"]
+    if search or limit:
+        if search:
+            data = [row for row in data if row["name"].lower().startswith(search)]
+        if limit:
+            data = data[:limit]
+        etag = hashlib.md5(f"{etag}:{search}:{limit}".encode()).hexdigest()
+
+    client_etag = frappe.local.form_dict.get("etag") or frappe.get_request_header("If-None-Match")
+    if client_etag and client_etag.strip('"') == etag:
+        return create_response(304, f"{doctype} List Not Modified", {"etag": etag})
+
+    synced_time = timeOfZone(datetime.now())
+    return create_response(200, f"{doctype} List Fetched Successfully", {
+        "time": synced_time,
+        "etag": etag,
+        key: data
+    })
+
+def clear_location_cache(doc=None, method=None):
+    """Doc event handler for Country, State and City changes"""
+    frappe.cache().delete_value(LOCATION_CACHE_KEY)
+
 #Country List
 @frappe.whitelist()
 def country():
     try:
-        # Construct base SQL query
-        base_query = "SELECT name FROM `tabCountry`"
-        # Execute base query
-        country_data = frappe.db.sql(base_query,as_dict=True)
-
-        # Creating the response
-        synced_time = timeOfZone(datetime.now())
-        create_response(200, "Country fetched successfully", {
-            "time": synced_time,
-            "country_data": country_data
-        })
+        location_response("Country", "country_data")
     except Exception as e:
         frappe.log_error(frappe.get_traceback(), "Error in fetching Country")    
 
@@ -41,35 +114,7 @@ def state():
         # Get parameters from request
         country = frappe.local.form_dict.get('country')
 
-        # Construct conditions for SQL queries
-        conditions = ""
-        values = {}
-
-        if country:
-            conditions = "country LIKE %(country)s"
-            values["country"] = f"%{country}%"
-
-        # Construct base SQL query with LEFT JOIN to include price from tabItem Price
-        base_query = """
-            SELECT 
-                name
-            FROM `tabState`
-        """
-
-        # Add conditions if any
-        if conditions:
-            base_query += f" WHERE {conditions}"
-
-        # Execute base query
-        state_data = frappe.db.sql(base_query, values, as_dict=True)
-
-
-        # Creating the response
-        synced_time = timeOfZone(datetime.now())
-        return create_response(200, "State List Fetched Successfully", {
-            "time": synced_time,
-            "state_data": state_data
-        })
+        return location_response("State", "state_data", country)
     except Exception as e:
         frappe.log_error(frappe.get_traceback(), "Error in fetching State")
         return create_response(500, "Error in fetching State")
@@ -83,134 +128,140 @@ def city():
         # Get parameters from request
         state = frappe.local.form_dict.get('state')
 
-        # Construct conditions for SQL queries
-        conditions = ""
-        values = {}
+        location_response("City", "city_data", state)
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), "Error in fetching City")
+        create_response(500, "Error in fetching City")
+    
 
-        if state:
-            conditions = "state LIKE %(state)s"
-            values["state"] = f"%{state}%"
 
-        # Construct base SQL query with LEFT JOIN to include price from tabItem Price
-        base_query = """
-            SELECT 
-                name
-            FROM `tabCity`
-        """
+#Home Page
+HOME_PAGE_CACHE_KEY = "erptech_lead:home_page"
+HOME_PAGE_CACHE_TTL = 300
+
+def build_home_page_payload():
+    """Assemble slider, best selling items and top categories for the landing page"""
+    # Fetch the Home Page Configuration document
+    home_page = frappe.get_cached_doc('Home Page')
+
+    # Fetch the Shop Setting document and get the warehouse value
+    setting = frappe.get_cached_doc('Shop Setting')
+    warehouse = setting.warehouse
+
+    # Ensure the warehouse is configured
+    if not warehouse:
+        frappe.throw("Please setup the Warehouse in Shop Setting.")
+
+    # Initialize lists to store slider data, best selling items, and item category data
+    slider_data = []
+    best_selling_items = []
+    top_item_groups = []
+
+    # Iterate over the slider child table entries
+    for child in home_page.slider:
+        # Access the fields of the child table (example fields: image, title, subtitle, button_text)
+        slider_data.append({
+            "image": child.image,
+            "title": child.title, 
+            "subtitle": child.sub_title,
+            "button_text": child.button_text
+        })
 
-        # Add conditions if any
-        if conditions:
-            base_query += f" WHERE {conditions}"
+    # Best selling items with one price per item: the lowest general (non customer
+    # specific) Standard Selling rate, pre-aggregated so the join can't fan out
+    best_selling_items_query = """
+        SELECT
+            i.item_code,
+            i.item_name AS item_title,
+            i.item_group,
+            i.description AS item_desc,
+            i.image AS item_image,
+            i.custom_image_hover AS item_image_hover,
+            COALESCE(bin.actual_qty, 0) AS available_qty,
+            COALESCE(price.price_list_rate, 0) AS item_price
+        FROM 
+            `tabItem` AS i
+        LEFT JOIN (
+            SELECT item_code, MIN(price_list_rate) AS price_list_rate
+            FROM `tabItem Price`
+            WHERE price_list = 'Standard Selling' AND IFNULL(customer, '') = ''
+            GROUP BY item_code
+        ) AS price ON price.item_code = i.item_code
+        LEFT JOIN 
+            `tabBin` bin ON bin.item_code = i.item_code AND bin.warehouse = %(warehouse)s
+        WHERE
+            i.custom_best_selling = 1
+        ORDER BY
+            i.item_code
+    """
+
+    # Execute the SQL query with warehouse parameter
+    best_selling_item_records = frappe.db.sql(best_selling_items_query, {'warehouse': warehouse}, as_dict=True)
+
+    # Append each best selling item to the list
+    for item in best_selling_item_records:
+        best_selling_items.append({
+            "item_code": item.item_code,
+            "item_title": item.item_title,  # Correct field for item name
+            "item_price": item.item_price,      # Correct field for price
+            "item_image": item.item_image,     # Correct field for image
+            "item_image_hover": item.item_image_hover,  # Hover image (if needed)
+            "available_qty": item.available_qty,    # Quantity available in warehouse
+            "item_group": item.item_group,          # Item group information
+            "item_desc": item.item_desc             # Description of the item
+        })
 
-        # Execute base query
-        city_data = frappe.db.sql(base_query, values, as_dict=True)
+    # Construct base SQL query with LEFT JOIN to include item count
+    base_query = """
+        SELECT 
+            ig.name AS item_group,
+            COUNT(i.name) AS item_count,
+            ig.custom_category_image
+        FROM `tabItem Group` ig
+        LEFT JOIN `tabItem` i ON i.item_group = ig.name
+        WHERE ig.is_group != 1
+        GROUP BY ig.name
+        ORDER BY COUNT(i.name) DESC, ig.name
+        LIMIT 3
+    """
+
+    # Execute the base query to get top 3 item groups
+    item_category_data = frappe.db.sql(base_query, as_dict=True)
+
+    # Append each item group and count to the list
+    for category in item_category_data:
+        top_item_groups.append({
+            "item_group": category.item_group,
+            "item_count": category.item_count,
+            "category_image": category.custom_category_image
+        })
 
+    return {
+        "slider_data": slider_data,
+        "categories": top_item_groups,
+        "best_selling_items": best_selling_items
+    }
 
-        # Creating the response
-        synced_time = timeOfZone(datetime.now())
-        create_response(200, "City List Fetched Successfully", {
-            "time": synced_time,
-            "city_data": city_data
-        })
-    except Exception as e:
-        frappe.log_error(frappe.get_traceback(), "Error in fetching City")
-        create_response(500, "Error in fetching City")
-    
+def clear_home_page_cache(doc=None, method=None):
+    """Doc event handler for Home Page, Shop Setting, Item and Item Group changes"""
+    frappe.cache().delete_value(HOME_PAGE_CACHE_KEY)
 
+def clear_home_page_cache_for_item(doc, method=None):
+    """Doc event handler for Item Price and Bin: only best selling items are on the page"""
+    if doc.get("item_code") and frappe.get_cached_value("Item", doc.item_code, "custom_best_selling"):
+        clear_home_page_cache()
 
-#Home Page
 @frappe.whitelist(allow_guest=True)
 def home_page_config():
     try:
-        # Fetch the Home Page Configuration document
-        home_page = frappe.get_doc('Home Page')
-
-        # Fetch the Shop Setting document and get the warehouse value
-        setting = frappe.get_cached_doc('Shop Setting')
-        warehouse = setting.warehouse
-
-        # Ensure the warehouse is configured
-        if not warehouse:
-            frappe.throw("Please setup the Warehouse in Shop Setting.")
-
-        # Initialize lists to store slider data, best selling items, and item category data
-        slider_data = []
-        best_selling_items = []
-        top_item_groups = []
-
-        # Iterate over the slider child table entries
-        for child in home_page.slider:
-            # Access the fields of the child table (example fields: image, title, subtitle, button_text)
-            slider_data.append({
-                "image": child.image,
-                "title": child.title, 
-                "subtitle": child.sub_title,
-                "button_text": child.button_text
-            })
-
-        # SQL query to join Item and Item Price tables and get best selling items with their price
-        best_selling_items_query = """
-            SELECT
-                i.item_code,
-                i.item_name AS item_title,
-                i.item_group,
-                i.description AS item_desc,
-                i.image AS item_image,
-                i.custom_image_hover AS item_image_hover,
-                COALESCE(bin.actual_qty, 0) AS available_qty,
-                COALESCE(it.price_list_rate, 0) AS item_price
-            FROM 
-                `tabItem` AS i
-            LEFT JOIN 
-                `tabItem Price` it ON it.item_code = i.item_code AND it.price_list = 'Standard Selling'
-            LEFT JOIN 
-                `tabBin` bin ON bin.item_code = i.item_code AND bin.warehouse = %(warehouse)s
-            WHERE
-                i.custom_best_selling = 1
-            GROUP BY 
-                i.item_code
-        """
-
-        # Execute the SQL query with warehouse parameter
-        best_selling_item_records = frappe.db.sql(best_selling_items_query, {'warehouse': warehouse}, as_dict=True)
-
-        # Append each best selling item to the list
-        for item in best_selling_item_records:
-            best_selling_items.append({
-                "item_code": item.item_code,
-                "item_title": item.item_title,  # Correct field for item name
-                "item_price": item.item_price,      # Correct field for price
-                "item_image": item.item_image,     # Correct field for image
-                "item_image_hover": item.item_image_hover,  # Hover image (if needed)
-                "available_qty": item.available_qty,    # Quantity available in warehouse
-                "item_group": item.item_group,          # Item group information
-                "item_desc": item.item_desc             # Description of the item
-            })
-
-        # Construct base SQL query with LEFT JOIN to include item count
-        base_query = """
-            SELECT 
-                ig.name AS item_group,
-                COUNT(i.name) AS item_count,
-                ig.custom_category_image
-            FROM `tabItem Group` ig
-            LEFT JOIN `tabItem` i ON i.item_group = ig.name
-            WHERE ig.is_group != 1
-            GROUP BY ig.name
-            ORDER BY COUNT(i.name) DESC
-            LIMIT 3
-        """
-
-        # Execute the base query to get top 3 item groups
-        item_category_data = frappe.db.sql(base_query, as_dict=True)
-
-        # Append each item group and count to the list
-        for category in item_category_data:
-            top_item_groups.append({
-                "item_group": category.item_group,
-                "item_count": category.item_count,
-                "category_image": category.custom_category_image
-            })
+        # Served from Redis; rebuilt on the first hit after a relevant change. The TTL
+        # bounds staleness of stock quantities, since Bin is mostly updated without doc events
+        payload = frappe.cache().get_value(HOME_PAGE_CACHE_KEY)
+        if payload is None:
+            payload = build_home_page_payload()
+            frappe.cache().set_value(
+                HOME_PAGE_CACHE_KEY, payload, expires_in_sec=HOME_PAGE_CACHE_TTL
+            )
 
         # Get the current time
         synced_time = timeOfZone(datetime.now())
@@ -218,9 +269,7 @@ def home_page_config():
         # Create response with slider data, best selling items, and top item groups
         create_response(200, "Home Page Fetched Successfully", {
             "time": synced_time,
-            "slider_data": slider_data,
-            "categories": top_item_groups,
-            "best_selling_items": best_selling_items
+            **payload
         })
 
     except Exception as e:
@@ -233,24 +282,26 @@ def home_page_config():
 
 
 #Settings Page
+def build_settings_payload():
+    """Public app settings, read from the document cache"""
+    globalDefaults = frappe.get_cached_doc('Global Defaults')
+    settings = frappe.get_cached_doc('Website Settings')
+    shopSettings = frappe.get_cached_doc('Shop Setting')
+
+    return {
+        "app_name": settings.app_name,
+        "app_logo": settings.app_logo,
+        "copyright": settings.copyright,
+        "address": settings.address,
+        "stripe_publishable_key": shopSettings.stripe_publishable_key,
+        "default_currency": globalDefaults.default_currency,
+    }
+
 @frappe.whitelist(allow_guest=True)
 def settings_page_config():
     try:
-
-        # Fetch the Shop Setting document and get the warehouse value
-        globalDefaults = frappe.get_cached_doc('Global Defaults')
-        settings = frappe.get_cached_doc('Website Settings')
-        shopSettings = frappe.get_cached_doc('Shop Setting')
-
-        # Create response with slider data, best selling items, and top item groups
-        create_response(200, "Setting Page Fetched Successfully", {
-            "app_name": settings.app_name,
-            "app_logo": settings.app_logo,
-            "copyright": settings.copyright,
-            "address": settings.address,
-            "stripe_publishable_key": shopSettings.stripe_publishable_key,
-            "default_currency": globalDefaults.default_currency,
-        })
+        # Create response with the public app settings
+        create_response(200, "Setting Page Fetched Successfully", build_settings_payload())
 
     except Exception as e:
         # Handle any exceptions and log errors
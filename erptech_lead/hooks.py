@@ -118,6 +118,9 @@ after_app_install = "erptech_lead.utils.after_app_install.after_app_install"
 # -----------
 # Permissions evaluated in scripted ways
 
+# Drop the cached permissions map whenever the whole cache is cleared (bench clear-cache)
+clear_cache = "erptech_lead.api.auth.clear_permissions_map_cache"
+
 # DocType Class
 # ---------------
 # Override standard doctype classes
@@ -132,13 +135,90 @@ after_app_install = "erptech_lead.utils.after_app_install.after_app_install"
 
 doc_events = {
 	"Lead": {
-		"on_update": "erptech_lead.api.hooks.on_update_lead"
+		"on_update": [
+			"erptech_lead.api.hooks.on_update_lead",
+			"erptech_lead.api.hooks.update_sales_rollup_for_lead"
+		],
+		"on_change": "erptech_lead.api.cache.invalidate_report_cache",
+		"after_delete": [
+			"erptech_lead.api.hooks.update_sales_rollup_for_lead",
+			"erptech_lead.api.cache.invalidate_report_cache"
+		]
+	},
+	"Sales Order": {
+		"on_update": "erptech_lead.api.hooks.update_sales_rollup_for_sales_order",
+		"on_submit": "erptech_lead.api.hooks.update_sales_rollup_for_sales_order",
+		"on_cancel": "erptech_lead.api.hooks.update_sales_rollup_for_sales_order",
+		"on_update_after_submit": "erptech_lead.api.hooks.update_sales_rollup_for_sales_order",
+		"on_change": "erptech_lead.api.cache.invalidate_report_cache",
+		"after_delete": [
+			"erptech_lead.api.hooks.update_sales_rollup_for_sales_order",
+			"erptech_lead.api.cache.invalidate_report_cache"
+		]
+	},
+	"Custom DocPerm": {
+		"on_change": "erptech_lead.api.auth.clear_permissions_map_cache",
+		"after_delete": "erptech_lead.api.auth.clear_permissions_map_cache"
+	},
+	"Role": {
+		"on_change": "erptech_lead.api.auth.clear_permissions_map_cache",
+		"after_delete": "erptech_lead.api.auth.clear_permissions_map_cache"
+	},
+	"Role Profile": {
+		"on_change": "erptech_lead.api.auth.clear_permissions_map_cache",
+		"after_delete": "erptech_lead.api.auth.clear_permissions_map_cache"
+	},
+	"Country": {
+		"on_change": "erptech_lead.api.utils.clear_location_cache",
+		"after_rename": "erptech_lead.api.utils.clear_location_cache",
+		"after_delete": "erptech_lead.api.utils.clear_location_cache"
+	},
+	"State": {
+		"on_change": "erptech_lead.api.utils.clear_location_cache",
+		"after_rename": "erptech_lead.api.utils.clear_location_cache",
+		"after_delete": "erptech_lead.api.utils.clear_location_cache"
+	},
+	"City": {
+		"on_change": "erptech_lead.api.utils.clear_location_cache",
+		"after_rename": "erptech_lead.api.utils.clear_location_cache",
+		"after_delete": "erptech_lead.api.utils.clear_location_cache"
+	},
+	"Home Page": {
+		"on_change": "erptech_lead.api.utils.clear_home_page_cache"
+	},
+	"Shop Setting": {
+		"on_change": "erptech_lead.api.utils.clear_home_page_cache"
+	},
+	"Item": {
+		"on_change": "erptech_lead.api.utils.clear_home_page_cache",
+		"after_rename": "erptech_lead.api.utils.clear_home_page_cache",
+		"after_delete": "erptech_lead.api.utils.clear_home_page_cache"
+	},
+	"Item Group": {
+		"on_change": "erptech_lead.api.utils.clear_home_page_cache",
+		"after_rename": "erptech_lead.api.utils.clear_home_page_cache",
+		"after_delete": "erptech_lead.api.utils.clear_home_page_cache"
+	},
+	"Item Price": {
+		"on_change": "erptech_lead.api.utils.clear_home_page_cache_for_item",
+		"after_delete": "erptech_lead.api.utils.clear_home_page_cache_for_item"
+	},
+	"Bin": {
+		"on_change": "erptech_lead.api.utils.clear_home_page_cache_for_item"
 	}
 }
 
 # Scheduled Tasks
 # ---------------
 
+scheduler_events = {
+	"daily": [
+		"erptech_lead.tasks.reconcile_sales_rollup",
+		"erptech_lead.tasks.send_legal_deadline_alerts",
+		"erptech_lead.tasks.refresh_passed_legal_deadlines"
+	]
+}
+
 # scheduler_events = {
 # 	"all": [
 # 		"erptech_lead.tasks.all"
@@ -1,9 +1,14 @@
 # Copyright (c) 2026, erptech and contributors
 # For license information, please see license.txt
 
-# import frappe
+import frappe
 from frappe.model.document import Document
 
 
 class AllFollowUp(Document):
 	pass
+
+
+def on_doctype_update():
+	"""The follow-up queue reads pending rows per parent doctype by due date"""
+	frappe.db.add_index("All FollowUp", ["parenttype", "next_followup_date", "followup_status"])
@@ -1,9 +1,14 @@
 # Copyright (c) 2025, erptech and contributors
 # For license information, please see license.txt
 
-# import frappe
+import frappe
 from frappe.model.document import Document
 
 
 class LeadFollowUpHistory(Document):
 	pass
+
+
+def on_doctype_update():
+	"""The follow-up queue reads history rows by due date"""
+	frappe.db.add_index("Lead Follow Up History", ["parenttype", "next_date"])
@@ -2,8 +2,24 @@
 # For license information, please see license.txt
 
 import frappe
-import json
 from frappe.model.document import Document
+from erptech_lead.my_lead.doctype.legal_activity_log.legal_activity_log import add_activity
+from erptech_lead.my_lead.doctype.legal_calendar_event.legal_calendar_event import (
+	delete_calendar_events,
+	sync_calendar_events,
+)
+from erptech_lead.my_lead.doctype.legal_case_link.legal_case_link import delete_case_links, sync_case_links
+from erptech_lead.my_lead.doctype.legal_party.legal_party import (
+	find_party_matches,
+	get_party_rows,
+	parties_changed,
+	sync_parties,
+)
+from erptech_lead.my_lead.doctype.legal_search_index.legal_search_index import update_search_index
+from erptech_lead.utils.field_diff import get_changed_fields
+
+# Audit fields maintained by the controller itself
+ACTIVITY_EXCLUDED_FIELDS = ("last_updated_date", "last_updated_by", "activity_log")
 
 
 class Legal(Document):
@@ -12,13 +28,6 @@ class Legal(Document):
 		self.created_by = frappe.session.user
 		self.created_date = frappe.utils.now()
 		
-		# Initialize activity log
-		self.activity_log = json.dumps([{
-			"user": frappe.session.user,
-			"timestamp": frappe.utils.now(),
-			"action": "Created"
-		}], indent=2, default=str)
-		
 		# Set initial last_updated fields same as created
 		self.last_updated_by = frappe.session.user
 		self.last_updated_date = frappe.utils.now()
@@ -28,68 +37,67 @@ class Legal(Document):
 		# Always update last_updated fields on save
 		self.last_updated_by = frappe.session.user
 		self.last_updated_date = frappe.utils.now()
-		
-		# Update activity log
-		self.update_activity_log()
+		sync_calendar_events(self)
+
+	def validate(self):
+		"""Warn about parties already involved in other cases"""
+		self.warn_duplicate_parties()
+
+	def after_insert(self):
+		"""Record creation in Legal Activity Log"""
+		self.update_activity_log("Created")
+
+	def on_update(self):
+		"""Refresh the search, party and case link indexes and record the update in Legal Activity Log"""
+		update_search_index(self)
+		sync_parties(self)
+		sync_case_links(self)
+		if self.flags.in_insert:
+			return
+		self.update_activity_log("Updated")
+
+	def on_trash(self):
+		"""Remove the case's activity, calendar, search, party and link rows so the Link check doesn't block deletion"""
+		frappe.db.delete("Legal Activity Log", {"legal": self.name})
+		frappe.db.delete("Legal Search Index", {"legal": self.name})
+		frappe.db.delete("Legal Party", {"legal": self.name})
+		delete_case_links(self.name)
+		delete_calendar_events(self)
 	
-	def update_activity_log(self):
-		"""Update activity log with current action"""
+	def update_activity_log(self, action):
+		"""Append one row to Legal Activity Log for the current action"""
 		try:
-			# Parse existing activity log
-			if self.activity_log:
-				try:
-					activity_log = json.loads(self.activity_log)
-				except (json.JSONDecodeError, TypeError):
-					activity_log = []
-			else:
-				activity_log = []
-			
-			# Determine action type
-			action = "Created" if self.is_new() else "Updated"
-			
-			# Add new activity entry
-			activity_entry = {
-				"user": frappe.session.user,
-				"timestamp": frappe.utils.now(),
-				"action": action
-			}
-			
-			# Add changed fields if updating
-			if not self.is_new() and hasattr(self, '_doc_before_save'):
-				changed_fields = self.get_changed_fields()
-				if changed_fields:
-					activity_entry["changes"] = changed_fields
-			
-			activity_log.append(activity_entry)
-			
-			# Keep only last 100 entries
-			if len(activity_log) > 100:
-				activity_log = activity_log[-100:]
-			
-			self.activity_log = json.dumps(activity_log, indent=2, default=str)
+			changes = None
+			if action == "Updated" and self.get_doc_before_save():
+				changes = self.get_changed_fields()
+
+			add_activity(self.name, action, changes)
 		except Exception as e:
 			# If activity log update fails, don't break the save
 			frappe.log_error(f"Error updating activity log: {str(e)}")
 	
 	def get_changed_fields(self):
-		"""Get changed fields for activity log"""
-		changed_fields = {}
-		if hasattr(self, '_doc_before_save'):
-			doc_before = self._doc_before_save
-			# Get all fields except system fields
-			excluded_fields = ['modified', 'modified_by', 'last_updated_date', 'last_updated_by', 
-							   'activity_log', 'creation', 'owner', 'name', 'docstatus']
-			
-			for field in self.meta.get_valid_columns():
-				if field not in excluded_fields:
-					try:
-						old_value = getattr(doc_before, field, None)
-						new_value = getattr(self, field, None)
-						if old_value != new_value:
-							changed_fields[field] = {
-								"old": str(old_value) if old_value is not None else None,
-								"new": str(new_value) if new_value is not None else None
-							}
-					except:
-						pass
-		return changed_fields
+		"""Get changed fields (including child table rows) for activity log"""
+		return get_changed_fields(self, exclude=ACTIVITY_EXCLUDED_FIELDS)
+
+	def warn_duplicate_parties(self):
+		"""Show which other cases already involve this case's accused or complainant (non-blocking)"""
+		if not parties_changed(self):
+			return
+
+		parties = [
+			{"party_name": row["party_name"], "father_name": row["father_name"]}
+			for row in get_party_rows(self)
+		]
+		warnings = []
+		for party in find_party_matches(parties, exclude_legal=self.name):
+			cases = sorted({row.legal for row in party["matches"]})
+			if cases:
+				warnings.append(f"{party['party_name']}: {', '.join(cases)}")
+
+		if warnings:
+			frappe.msgprint(
+				"<br>".join(warnings),
+				title="Parties found in other cases",
+				indicator="orange",
+			)
@@ -0,0 +1,27 @@
+# Copyright (c) 2026, erptech and contributors
+# For license information, please see license.txt
+
+import frappe
+import json
+from frappe.model.document import Document
+
+
+class LegalActivityLog(Document):
+	pass
+
+
+def on_doctype_update():
+	"""Recent-first reads per case walk this index instead of the whole table"""
+	frappe.db.add_index("Legal Activity Log", ["legal", "activity_time"])
+
+
+def add_activity(legal, action, changes=None, user=None, timestamp=None):
+	"""Append one activity row without loading or re-serializing earlier entries"""
+	frappe.get_doc({
+		"doctype": "Legal Activity Log",
+		"legal": legal,
+		"activity_time": timestamp or frappe.utils.now(),
+		"user": user or frappe.session.user,
+		"action": action,
+		"changes": json.dumps(changes, default=str) if changes else None,
+	}).db_insert()
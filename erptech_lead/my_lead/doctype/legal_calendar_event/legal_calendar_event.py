@@ -0,0 +1,136 @@
+# Copyright (c) 2026, erptech and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import getdate, split_emails, validate_email_address
+from erptech_lead.utils.field_diff import values_differ
+
+# Per source doctype: date fields that become events (fieldname -> event type) and the
+# fields copied onto each event for filtering
+CALENDAR_SOURCES = {
+	"Legal": {
+		"dates": {
+			"next_date_of_hearing": "Hearing",
+			"next_investigation_date": "Investigation",
+			"limitation_date_alerts": "Limitation",
+			"next_legal_action_due": "Legal Action Due",
+		},
+		"advocate": "advocate_name",
+		"court": "court_name",
+		"property_id": None,
+		"alert_fields": (),
+	},
+	"Legal Plot": {
+		"dates": {
+			"next_hearing_date": "Hearing",
+			"next_hearing_visit_date": "Hearing / Visit",
+			"critical_deadline": "Critical Deadline",
+			"expected_disposal_date": "Expected Disposal",
+		},
+		"advocate": "advocate_handling",
+		"court": "court_name",
+		"property_id": "property_id",
+		"alert_fields": ("alert_required", "alert_sent_to", "escalation_level"),
+	},
+}
+
+
+class LegalCalendarEvent(Document):
+	pass
+
+
+def on_doctype_update():
+	"""Window queries filter on event_date first, then one of advocate, court or property"""
+	frappe.db.add_index("Legal Calendar Event", ["event_date", "advocate"])
+	frappe.db.add_index("Legal Calendar Event", ["event_date", "court"])
+	frappe.db.add_index("Legal Calendar Event", ["event_date", "property_id"])
+	frappe.db.add_index("Legal Calendar Event", ["source_doctype", "source_name"])
+
+
+def get_calendar_fields(source):
+	return [
+		*source["dates"],
+		*(source[key] for key in ("advocate", "court", "property_id") if source[key]),
+		*source["alert_fields"],
+	]
+
+
+def calendar_fields_changed(doc_before, doc, source):
+	"""Compare as typed values, so a date sent as a string by an API save doesn't count as a change"""
+	meta = frappe.get_meta(doc.doctype)
+	return any(
+		values_differ(doc_before.get(fieldname), doc.get(fieldname), meta.get_field(fieldname).fieldtype)
+		for fieldname in get_calendar_fields(source)
+	)
+
+
+def get_alert_recipients(doctype, row):
+	"""
+	Emails alerted about the row's events, as a comma separated string
+
+	Only Legal Plot rows with Alert Required = Yes are alerted: the addresses
+	in Alert Sent To plus, for an escalated plot, the addresses configured
+	for its level under `erptech_lead_legal_escalation_recipients` in site
+	config, e.g. {"Management": ["md@example.com"]}.
+	"""
+	if "alert_required" not in CALENDAR_SOURCES[doctype]["alert_fields"] or row.get("alert_required") != "Yes":
+		return None
+
+	recipients = split_emails(row.get("alert_sent_to") or "")
+	escalation = frappe.conf.get("erptech_lead_legal_escalation_recipients") or {}
+	if row.get("escalation_level"):
+		recipients += escalation.get(row.get("escalation_level")) or []
+
+	emails = []
+	for recipient in recipients:
+		email = validate_email_address(recipient.strip())
+		if email and email not in emails:
+			emails.append(email)
+	return ", ".join(emails) or None
+
+
+def sync_calendar_events(doc):
+	"""
+	Replace the calendar rows of a Legal or Legal Plot document
+
+	Called from before_save; does nothing unless one of the date, advocate,
+	court, property or alert fields changed, so ordinary saves cost no extra
+	writes. Rewritten rows get a new creation time, which is what the deadline
+	alert job uses to pick up changed events.
+	"""
+	source = CALENDAR_SOURCES[doc.doctype]
+	doc_before = doc.get_doc_before_save()
+	if doc_before and not calendar_fields_changed(doc_before, doc, source):
+		return
+
+	delete_calendar_events(doc)
+	insert_calendar_events(doc.doctype, doc)
+
+
+def insert_calendar_events(doctype, row):
+	"""Insert one event per filled date field of `row` (a document or a get_all row)"""
+	source = CALENDAR_SOURCES[doctype]
+	context = {
+		key: row.get(source[key]) if source[key] else None
+		for key in ("advocate", "court", "property_id")
+	}
+	context["alert_recipients"] = get_alert_recipients(doctype, row)
+	for fieldname, event_type in source["dates"].items():
+		event_date = row.get(fieldname)
+		if not event_date:
+			continue
+		frappe.get_doc({
+			"doctype": "Legal Calendar Event",
+			"event_date": getdate(event_date),
+			"event_type": event_type,
+			"source_doctype": doctype,
+			"source_name": row.name,
+			**context,
+		}).db_insert()
+
+
+def delete_calendar_events(doc):
+	frappe.db.delete(
+		"Legal Calendar Event", {"source_doctype": doc.doctype, "source_name": doc.name}
+	)
@@ -0,0 +1,179 @@
+# Copyright (c) 2026, erptech and contributors
+# For license information, please see license.txt
+
+import re
+
+import frappe
+from frappe.model.document import Document
+
+# Linked case fields hold references separated by commas, semicolons or new lines
+REFERENCE_SEPARATORS = re.compile(r"[,;\n\r]+")
+
+# Legal fields a reference may point at, in order of preference
+REFERENCE_FIELDS = ("name", "fir_case_number", "case_number_court")
+
+
+class LegalCaseLink(Document):
+	pass
+
+
+def on_doctype_update():
+	"""Traversal walks edges from either end; dangling references are resolved by text"""
+	frappe.db.add_index("Legal Case Link", ["source_legal"])
+	frappe.db.add_index("Legal Case Link", ["target_legal"])
+	frappe.db.add_index("Legal Case Link", ["reference"])
+
+
+def parse_references(text):
+	"""Distinct non-empty references in a free text field, in order of appearance"""
+	references = []
+	for reference in REFERENCE_SEPARATORS.split(text or ""):
+		reference = " ".join(reference.split())[:140]
+		if reference and reference.lower() not in (r.lower() for r in references):
+			references.append(reference)
+	return references
+
+
+def get_link_rows(doc):
+	"""(link_type, accused_name, reference) for every reference written on a Legal document"""
+	rows = [("Counter Case", None, reference) for reference in parse_references(doc.get("linked_counter_cases"))]
+	for accused in doc.get("accused_details") or []:
+		rows += [
+			("Accused Case", accused.accused_name, reference)
+			for reference in parse_references(accused.linked_case_ids)
+		]
+	return rows
+
+
+def get_reference_keys(doc):
+	"""Values other cases may use to refer to this one"""
+	return {doc.get(fieldname) for fieldname in REFERENCE_FIELDS if doc.get(fieldname)}
+
+
+def resolve_references(references, exclude_legal=None):
+	"""Map lower-cased references to the Legal they identify; unknown references are left out"""
+	if not references:
+		return {}
+
+	candidates = frappe.get_all(
+		"Legal",
+		or_filters=[[fieldname, "in", list(references)] for fieldname in REFERENCE_FIELDS],
+		fields=list(REFERENCE_FIELDS),
+	)
+	resolved = {}
+	for fieldname in reversed(REFERENCE_FIELDS):
+		for candidate in candidates:
+			if candidate.name != exclude_legal and candidate.get(fieldname):
+				resolved[candidate.get(fieldname).lower()] = candidate.name
+	return resolved
+
+
+def sync_case_links(doc):
+	"""
+	Keep the case's edges in Legal Case Link current; called from Legal.on_update
+
+	Outgoing edges are rewritten when a linked case field changed. When the
+	case's own ID, FIR or court number changed, edges from other cases that
+	were waiting for (or pointed at) those values are re-targeted.
+	"""
+	doc_before = doc.get_doc_before_save()
+
+	rows = get_link_rows(doc)
+	if not doc_before or get_link_rows(doc_before) != rows:
+		frappe.db.delete("Legal Case Link", {"source_legal": doc.name})
+		insert_case_links(doc.name, rows)
+
+	keys = get_reference_keys(doc)
+	if not doc_before or get_reference_keys(doc_before) != keys:
+		retarget_incoming_links(doc.name, keys)
+
+
+def insert_case_links(legal, rows):
+	resolved = resolve_references({reference for _, _, reference in rows}, exclude_legal=legal)
+	for link_type, accused_name, reference in rows:
+		frappe.get_doc({
+			"doctype": "Legal Case Link",
+			"source_legal": legal,
+			"link_type": link_type,
+			"accused_name": accused_name,
+			"reference": reference,
+			"target_legal": resolved.get(reference.lower()),
+		}).db_insert()
+
+
+def retarget_incoming_links(legal, keys):
+	"""Point edges whose reference matches one of `keys` at `legal`, and release ones that no longer match"""
+	keys = tuple(keys) or ("",)
+	frappe.db.sql(
+		"""
+		UPDATE `tabLegal Case Link`
+		SET target_legal = NULL
+		WHERE target_legal = %(legal)s AND reference NOT IN %(keys)s
+		""",
+		{"legal": legal, "keys": keys},
+	)
+	frappe.db.sql(
+		"""
+		UPDATE `tabLegal Case Link`
+		SET target_legal = %(legal)s
+		WHERE target_legal IS NULL AND reference IN %(keys)s AND source_legal != %(legal)s
+		""",
+		{"legal": legal, "keys": keys},
+	)
+
+
+def delete_case_links(legal):
+	"""Drop the case's own edges and leave edges pointing at it as unresolved references"""
+	frappe.db.delete("Legal Case Link", {"source_legal": legal})
+	frappe.db.set_value(
+		"Legal Case Link", {"target_legal": legal}, "target_legal", None, update_modified=False
+	)
+
+
+def get_connected_cases(legal, max_depth, max_nodes):
+	"""
+	Breadth-first walk of the case graph around `legal`, ignoring edge direction
+
+	One query per level fetches every edge touching the current frontier.
+	Returns ({case: depth}, edges between visited cases and unresolved
+	references of visited cases, truncated) where `truncated` is set when
+	`max_nodes` stopped the walk early.
+	"""
+	depths = {legal: 0}
+	edges = {}
+	frontier = [legal]
+	truncated = False
+
+	for depth in range(1, max_depth + 1):
+		rows = frappe.db.sql(
+			"""
+			SELECT name, source_legal, target_legal, link_type, accused_name, reference
+			FROM `tabLegal Case Link` WHERE source_legal IN %(frontier)s
+			UNION
+			SELECT name, source_legal, target_legal, link_type, accused_name, reference
+			FROM `tabLegal Case Link` WHERE target_legal IN %(frontier)s
+			""",
+			{"frontier": tuple(frontier)},
+			as_dict=True,
+		)
+
+		next_frontier = []
+		for row in rows:
+			edges[row.name] = row
+			for node in (row.source_legal, row.target_legal):
+				if node and node not in depths:
+					if len(depths) >= max_nodes:
+						truncated = True
+						continue
+					depths[node] = depth
+					next_frontier.append(node)
+
+		frontier = next_frontier
+		if not frontier or truncated:
+			break
+
+	edges = [
+		edge for edge in edges.values()
+		if edge.source_legal in depths and (not edge.target_legal or edge.target_legal in depths)
+	]
+	return depths, edges, truncated
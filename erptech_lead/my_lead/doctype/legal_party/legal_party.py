@@ -0,0 +1,170 @@
+# Copyright (c) 2026, erptech and contributors
+# For license information, please see license.txt
+
+import re
+import unicodedata
+
+import frappe
+from frappe.model.document import Document
+
+# Titles and words that don't identify a person
+NAME_NOISE = {
+	"mr", "mrs", "ms", "miss", "dr", "shri", "sri", "smt", "kumari", "km", "late",
+	"alias", "urf",
+}
+
+# Common abbreviations, expanded before folding
+NAME_ABBREVIATIONS = {"mohd": "mohammad", "md": "mohammad"}
+
+# Spelling variants that romanized Indian names commonly swap, folded to one form (in order)
+TRANSLITERATION_FOLDS = (
+	("ph", "f"),
+	("bh", "b"),
+	("dh", "d"),
+	("gh", "g"),
+	("kh", "k"),
+	("th", "t"),
+	("sh", "s"),
+	("ck", "k"),
+	("q", "k"),
+	("w", "v"),
+	("z", "j"),
+	("ee", "i"),
+	("oo", "u"),
+	("ou", "u"),
+	("y", "i"),
+)
+
+
+class LegalParty(Document):
+	pass
+
+
+def on_doctype_update():
+	"""Lookups match on the name key (and father key when given); cleanup is per case"""
+	frappe.db.add_index("Legal Party", ["name_key", "father_key"])
+	frappe.db.add_index("Legal Party", ["legal"])
+
+
+def get_name_key(name):
+	"""
+	Matching key for a person or organisation name
+
+	Case, accents, punctuation, titles (Mr, Shri, Smt, ...) and word order are
+	ignored, and common transliteration variants are folded, so "Shri Mohd.
+	Yousuf Khan" and "KHAN MOHAMMAD YUSUF" give the same key.
+	"""
+	if not name:
+		return ""
+
+	# Relation markers ("s/o", "d/o", "w/o") introduce the father's or husband's name
+	name = re.split(r"\b[sdwc]\s*/\s*o\b", str(name).lower())[0]
+	name = "".join(
+		char if char.isalnum() or unicodedata.category(char).startswith("M") else " "
+		for char in strip_accents(name)
+	)
+
+	tokens = []
+	for token in name.split():
+		if token in NAME_NOISE:
+			continue
+		token = NAME_ABBREVIATIONS.get(token, token)
+		for variant, folded in TRANSLITERATION_FOLDS:
+			token = token.replace(variant, folded)
+		# Doubled letters ("Mohammad" / "Mohamad") and a trailing "h" ("Shah" / "Sha")
+		token = re.sub(r"(.)\1+", r"\1", token)
+		if len(token) > 2:
+			token = token.rstrip("h")
+		tokens.append(token)
+
+	return " ".join(sorted(tokens))
+
+
+def strip_accents(text):
+	"""Drop accents from Latin letters ("José" -> "jose"); vowel signs of Indic scripts are kept"""
+	decomposed = unicodedata.normalize("NFKD", text)
+	kept = []
+	for char in decomposed:
+		if unicodedata.combining(char) and kept and kept[-1].isascii():
+			continue
+		kept.append(char)
+	return unicodedata.normalize("NFC", "".join(kept))
+
+
+def get_party_rows(doc):
+	"""Parties of a Legal document as index rows: accused, complainant and organisation"""
+	parties = [
+		("Accused", row.accused_name, row.father_name) for row in doc.get("accused_details") or []
+	]
+	parties.append(("Complainant", doc.get("complainant_name"), None))
+	parties.append(("Organisation", doc.get("organisation_name"), None))
+
+	rows = []
+	for party_type, party_name, father_name in parties:
+		name_key = get_name_key(party_name)
+		if not name_key:
+			continue
+		rows.append({
+			"party_type": party_type,
+			"party_name": party_name,
+			"father_name": father_name,
+			"name_key": name_key,
+			"father_key": get_name_key(father_name),
+		})
+	return rows
+
+
+def parties_changed(doc):
+	doc_before = doc.get_doc_before_save()
+	return not doc_before or get_party_rows(doc_before) != get_party_rows(doc)
+
+
+def sync_parties(doc):
+	"""Rewrite the case's Legal Party rows when any party changed; called from Legal.on_update"""
+	if not parties_changed(doc):
+		return
+
+	frappe.db.delete("Legal Party", {"legal": doc.name})
+	insert_parties(doc.name, get_party_rows(doc))
+
+
+def insert_parties(legal, rows):
+	for row in rows:
+		frappe.get_doc({"doctype": "Legal Party", "legal": legal, **row}).db_insert()
+
+
+def find_party_matches(parties, exclude_legal=None):
+	"""
+	Index rows of other cases matching each party
+
+	`parties` is a list of {"party_name", "father_name"}. Returns a list of
+	{"party_name", "father_name", "matches": [Legal Party rows]} in the same
+	order. A father name only narrows the match when both sides have one.
+	"""
+	keyed = [
+		(party, get_name_key(party.get("party_name")), get_name_key(party.get("father_name")))
+		for party in parties
+	]
+	name_keys = list({name_key for _, name_key, _ in keyed if name_key})
+	if not name_keys:
+		return [{**party, "matches": []} for party, _, _ in keyed]
+
+	filters = [["name_key", "in", name_keys]]
+	if exclude_legal:
+		filters.append(["legal", "!=", exclude_legal])
+	candidates = frappe.get_all(
+		"Legal Party",
+		filters=filters,
+		fields=["legal", "party_type", "party_name", "father_name", "name_key", "father_key"],
+		order_by="legal desc",
+	)
+
+	result = []
+	for party, name_key, father_key in keyed:
+		matches = [
+			row for row in candidates
+			if row.name_key == name_key
+			and (not father_key or not row.father_key or row.father_key == father_key)
+		]
+		result.append({**party, "matches": matches})
+	return result
@@ -3,6 +3,36 @@
 
 import frappe
 from frappe.model.document import Document
+from frappe.utils import getdate, today
+from erptech_lead.my_lead.doctype.legal_calendar_event.legal_calendar_event import (
+	delete_calendar_events,
+	sync_calendar_events,
+)
+from erptech_lead.my_lead.doctype.legal_spend_rollup.legal_spend_rollup import apply_spend_delta, remove_spend
+from erptech_lead.utils.field_diff import values_differ
+
+# Ranking used to pick the worst value across a property's open activities
+RISK_LEVELS = ("Low", "Medium", "High")
+IMPACT_LEVELS = ("Delayed", "Blocked")
+
+# Dates whose earliest upcoming value is the property's next legal deadline
+DEADLINE_FIELDS = ("critical_deadline", "next_hearing_date", "next_hearing_visit_date", "expected_disposal_date")
+
+# Legal Risk fields of Plot Detail written by refresh_property_risk, with their fieldtypes
+PROPERTY_RISK_FIELDS = {
+	"legal_risk_level": "Select",
+	"legal_impact": "Select",
+	"legal_risk_categories": "Data",
+	"open_legal_activities": "Int",
+	"next_legal_deadline": "Date",
+	"legal_non_compliant": "Check",
+	"legal_dispute": "Check",
+}
+
+RISK_SOURCE_FIELDS = (
+	"activity_status", "risk_level", "impact_on_project", "legal_risk_category",
+	"stay_status", "compliance_status", *DEADLINE_FIELDS,
+)
 
 
 class LegalPlot(Document):
@@ -13,5 +43,83 @@ class LegalPlot(Document):
 		self.last_updated_on = frappe.utils.now()
 
 	def before_save(self):
-		"""Auto-fill last_updated_on on document save"""
+		"""Auto-fill last_updated_on on document save and keep the calendar and spend rollup current"""
 		self.last_updated_on = frappe.utils.now()
+		sync_calendar_events(self)
+		apply_spend_delta(self)
+
+	def on_trash(self):
+		"""Remove the plot's calendar rows and its share of the spend rollup"""
+		delete_calendar_events(self)
+		remove_spend(self)
+
+	def on_update(self):
+		"""Refresh the legal risk summary of the linked property (and the previous one, if it changed)"""
+		doc_before = self.get_doc_before_save()
+		if doc_before and not any(
+			values_differ(doc_before.get(fieldname), self.get(fieldname), self.meta.get_field(fieldname).fieldtype)
+			for fieldname in ("property_id", *RISK_SOURCE_FIELDS)
+		):
+			return
+
+		refresh_property_risk(self.property_id)
+		if doc_before and doc_before.property_id != self.property_id:
+			refresh_property_risk(doc_before.property_id)
+
+	def after_delete(self):
+		refresh_property_risk(self.property_id)
+
+
+def worst(values, ranking):
+	ranks = [ranking.index(value) for value in values if value in ranking]
+	return ranking[max(ranks)] if ranks else None
+
+
+def refresh_property_risk(property_id):
+	"""
+	Recompute the Legal Risk fields of one Plot Detail from its Legal Plot rows
+
+	Only open activities (status other than Closed) count. Legal Dispute is
+	set while one of them is high risk, delays or blocks the project, or has
+	a stay, and cleared once none does. The user-edited Legal Status is left
+	alone. The row is only written, and `modified` only moves for delta sync,
+	when one of the values actually changed.
+	"""
+	if not property_id:
+		return
+	current = frappe.db.get_value("Plot Detail", property_id, list(PROPERTY_RISK_FIELDS), as_dict=True)
+	if not current:
+		return
+
+	activities = frappe.get_all(
+		"Legal Plot",
+		filters={"property_id": property_id, "activity_status": ["!=", "Closed"]},
+		fields=list(RISK_SOURCE_FIELDS),
+	)
+
+	start = getdate(today())
+	deadlines = [
+		getdate(activity.get(fieldname))
+		for activity in activities for fieldname in DEADLINE_FIELDS
+		if activity.get(fieldname) and getdate(activity.get(fieldname)) >= start
+	]
+	risk_level = worst([activity.risk_level for activity in activities], RISK_LEVELS)
+	impact = worst([activity.impact_on_project for activity in activities], IMPACT_LEVELS)
+	in_dispute = risk_level == "High" or bool(impact) or any((activity.stay_status or "").strip() for activity in activities)
+
+	values = {
+		"legal_risk_level": risk_level,
+		"legal_impact": impact,
+		"legal_risk_categories": ", ".join(
+			sorted({activity.legal_risk_category for activity in activities if activity.legal_risk_category})
+		),
+		"open_legal_activities": len(activities),
+		"next_legal_deadline": min(deadlines) if deadlines else None,
+		"legal_non_compliant": int(any(activity.compliance_status == "Non-Compliant" for activity in activities)),
+		"legal_dispute": int(in_dispute),
+	}
+	if any(
+		values_differ(current.get(fieldname), values[fieldname], fieldtype)
+		for fieldname, fieldtype in PROPERTY_RISK_FIELDS.items()
+	):
+		frappe.db.set_value("Plot Detail", property_id, values)
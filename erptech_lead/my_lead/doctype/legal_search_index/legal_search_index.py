@@ -0,0 +1,67 @@
+# Copyright (c) 2026, erptech and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import now, strip_html_tags
+
+# Legal fields whose text is searchable
+SEARCH_FIELDS = (
+	"brief_gist_allegations",
+	"detailed_case_summary",
+	"remarks_advocate_notes",
+	"sections_invoked",
+	"last_order_summary",
+)
+
+FULLTEXT_INDEX = "content_fulltext"
+
+
+class LegalSearchIndex(Document):
+	pass
+
+
+def on_doctype_update():
+	"""FULLTEXT isn't expressible in DocType JSON, so add it here (MariaDB only)"""
+	if frappe.db.db_type != "mariadb":
+		return
+	if not frappe.db.has_index("tabLegal Search Index", FULLTEXT_INDEX):
+		frappe.db.sql_ddl(
+			f"ALTER TABLE `tabLegal Search Index` ADD FULLTEXT INDEX `{FULLTEXT_INDEX}` (`content`)"
+		)
+
+
+def get_search_content(row):
+	"""Plain text of the search fields of a Legal document or get_all row, one field per line"""
+	parts = []
+	for fieldname in SEARCH_FIELDS:
+		value = row.get(fieldname)
+		if value:
+			parts.append(" ".join(strip_html_tags(value).split()))
+	return "\n".join(parts)
+
+
+def update_search_index(doc):
+	"""Upsert the case's row; skipped when no search field changed"""
+	doc_before = doc.get_doc_before_save()
+	if doc_before and all(doc_before.get(f) == doc.get(f) for f in SEARCH_FIELDS):
+		return
+	upsert_search_row(doc.name, get_search_content(doc))
+
+
+def upsert_search_row(legal, content):
+	"""Insert or overwrite the search row of a single case"""
+	timestamp = now()
+	frappe.db.sql(
+		"""
+		INSERT INTO `tabLegal Search Index`
+			(name, legal, content, creation, modified, owner, modified_by, docstatus, idx)
+		VALUES
+			(%(legal)s, %(legal)s, %(content)s,
+			%(timestamp)s, %(timestamp)s, 'Administrator', 'Administrator', 0, 0)
+		ON DUPLICATE KEY UPDATE
+			content = VALUES(content),
+			modified = VALUES(modified)
+		""",
+		{"legal": legal, "content": content, "timestamp": timestamp},
+	)
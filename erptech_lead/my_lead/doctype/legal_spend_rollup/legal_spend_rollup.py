@@ -0,0 +1,158 @@
+# Copyright (c) 2026, erptech and contributors
+# For license information, please see license.txt
+
+import hashlib
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import cint, flt, getdate, now
+
+# Legal Plot fields summed into each bucket, with the cast applied to them
+SPEND_MEASURES = {
+	"amount_paid": flt,
+	"fee_paid": flt,
+	"legal_spend_today": flt,
+	"new_cases_filed": cint,
+	"orders_received": cint,
+	"revenue_approvals_received": cint,
+}
+
+
+class LegalSpendRollup(Document):
+	pass
+
+
+def on_doctype_update():
+	"""Date-range reads per property or budget head are index range scans"""
+	frappe.db.add_index("Legal Spend Rollup", ["rollup_date", "property_id"])
+	frappe.db.add_index("Legal Spend Rollup", ["rollup_date", "budget_head"])
+
+
+def get_rollup_name(property_id, budget_head, day):
+	"""Deterministic name so each (property, budget head, day) bucket is a single upsertable row"""
+	key = f"{property_id or ''}|{budget_head or ''}|{getdate(day)}"
+	return hashlib.md5(key.encode()).hexdigest()
+
+
+def get_spend_day(row):
+	"""Payment date, else activity date, else the day the entry was made"""
+	return getdate(row.get("payment_date") or row.get("activity_date") or row.get("entered_on") or now())
+
+
+def get_contribution(row):
+	"""The bucket key of a Legal Plot row and the amounts it adds to that bucket"""
+	return (
+		(row.get("property_id") or "", (row.get("budget_head") or "").strip(), get_spend_day(row)),
+		{fieldname: cast(row.get(fieldname)) for fieldname, cast in SPEND_MEASURES.items()},
+	)
+
+
+def apply_spend_delta(doc):
+	"""
+	Move a Legal Plot's contribution between buckets; called from before_save
+
+	Only the difference against the saved version is written: one upsert
+	when the bucket is unchanged, a decrement and an increment when the
+	property, budget head or day changed.
+	"""
+	doc_before = doc.get_doc_before_save()
+	key, amounts = get_contribution(doc)
+
+	if not doc_before:
+		add_to_bucket(key, amounts, entries=1)
+		return
+
+	old_key, old_amounts = get_contribution(doc_before)
+	if old_key == key:
+		delta = {fieldname: amounts[fieldname] - old_amounts[fieldname] for fieldname in SPEND_MEASURES}
+		if any(delta.values()):
+			add_to_bucket(key, delta, entries=0)
+		return
+
+	remove_from_bucket(old_key, old_amounts)
+	add_to_bucket(key, amounts, entries=1)
+
+
+def remove_spend(doc):
+	"""Take a deleted Legal Plot out of its bucket; called from on_trash"""
+	remove_from_bucket(*get_contribution(doc))
+
+
+def remove_from_bucket(key, amounts):
+	add_to_bucket(key, {fieldname: -value for fieldname, value in amounts.items()}, entries=-1)
+	frappe.db.sql(
+		"DELETE FROM `tabLegal Spend Rollup` WHERE name = %(name)s AND entries <= 0",
+		{"name": get_rollup_name(*key)},
+	)
+
+
+def add_to_bucket(key, amounts, entries):
+	"""Increment a bucket in place, creating it on first use"""
+	property_id, budget_head, day = key
+	timestamp = now()
+	frappe.db.sql(
+		"""
+		INSERT INTO `tabLegal Spend Rollup`
+			(name, property_id, budget_head, rollup_date, entries,
+			amount_paid, fee_paid, legal_spend_today,
+			new_cases_filed, orders_received, revenue_approvals_received,
+			creation, modified, owner, modified_by, docstatus, idx)
+		VALUES
+			(%(name)s, %(property_id)s, %(budget_head)s, %(day)s, %(entries)s,
+			%(amount_paid)s, %(fee_paid)s, %(legal_spend_today)s,
+			%(new_cases_filed)s, %(orders_received)s, %(revenue_approvals_received)s,
+			%(timestamp)s, %(timestamp)s, 'Administrator', 'Administrator', 0, 0)
+		ON DUPLICATE KEY UPDATE
+			entries = entries + VALUES(entries),
+			amount_paid = amount_paid + VALUES(amount_paid),
+			fee_paid = fee_paid + VALUES(fee_paid),
+			legal_spend_today = legal_spend_today + VALUES(legal_spend_today),
+			new_cases_filed = new_cases_filed + VALUES(new_cases_filed),
+			orders_received = orders_received + VALUES(orders_received),
+			revenue_approvals_received = revenue_approvals_received + VALUES(revenue_approvals_received),
+			modified = VALUES(modified)
+		""",
+		{
+			"name": get_rollup_name(property_id, budget_head, day),
+			"property_id": property_id,
+			"budget_head": budget_head,
+			"day": day,
+			"entries": entries,
+			"timestamp": timestamp,
+			**amounts,
+		},
+	)
+
+
+def rebuild_spend_rollup():
+	"""Recompute every bucket from Legal Plot set-wise (backfill and repair)"""
+	frappe.db.sql("DELETE FROM `tabLegal Spend Rollup`")
+	frappe.db.sql(
+		"""
+		INSERT INTO `tabLegal Spend Rollup`
+			(name, property_id, budget_head, rollup_date, entries,
+			amount_paid, fee_paid, legal_spend_today,
+			new_cases_filed, orders_received, revenue_approvals_received,
+			creation, modified, owner, modified_by, docstatus, idx)
+		SELECT
+			MD5(CONCAT(property_id, '|', budget_head, '|', day)), property_id, budget_head, day, COUNT(*),
+			SUM(amount_paid), SUM(fee_paid), SUM(legal_spend_today),
+			SUM(new_cases_filed), SUM(orders_received), SUM(revenue_approvals_received),
+			%(timestamp)s, %(timestamp)s, 'Administrator', 'Administrator', 0, 0
+		FROM (
+			SELECT
+				IFNULL(property_id, '') AS property_id,
+				TRIM(IFNULL(budget_head, '')) AS budget_head,
+				COALESCE(payment_date, activity_date, DATE(entered_on), DATE(creation)) AS day,
+				IFNULL(amount_paid, 0) AS amount_paid,
+				IFNULL(fee_paid, 0) AS fee_paid,
+				IFNULL(legal_spend_today, 0) AS legal_spend_today,
+				IFNULL(new_cases_filed, 0) AS new_cases_filed,
+				IFNULL(orders_received, 0) AS orders_received,
+				IFNULL(revenue_approvals_received, 0) AS revenue_approvals_received
+			FROM `tabLegal Plot`
+		) AS entries
+		GROUP BY property_id, budget_head, day
+		""",
+		{"timestamp": now()},
+	)
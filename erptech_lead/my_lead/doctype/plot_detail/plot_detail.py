@@ -1,10 +1,71 @@
 # Copyright (c) 2025, erptech and contributors
 # For license information, please see license.txt
 
-# import frappe
+import frappe
 from frappe.model.document import Document
+from frappe.utils import flt
+from erptech_lead.utils.dimensions import parse_area_sqft, parse_dimensions_ft, parse_length_ft
+
+# Free text dimension fields and the indexed numeric columns derived from them
+NUMERIC_DIMENSION_FIELDS = {"plot_size": "plot_size_sqft", "length": "length_ft", "width": "width_ft"}
 
 
 class PlotDetail(Document):
-	pass
+	def validate(self):
+		self.update(get_numeric_dimensions(self))
+
+
+def on_doctype_update():
+	"""
+	Inventory summaries group by layout, status, type and facing; with the
+	plot value as the last column the index covers the whole query
+	"""
+	frappe.db.add_index(
+		"Plot Detail",
+		["project_layout_name", "plot_status", "plot_type", "facing", "total_plot_value"],
+		index_name="inventory_index",
+	)
+
+
+def get_numeric_dimensions(row):
+	"""
+	plot_size_sqft, length_ft and width_ft for a Plot Detail document or row
+
+	A size written as "30x40" also fills a missing length and width, and a
+	missing or unparseable size falls back to length times width.
+	"""
+	length_ft = parse_length_ft(row.get("length"))
+	width_ft = parse_length_ft(row.get("width"))
+	dimensions = parse_dimensions_ft(row.get("plot_size"))
+	if dimensions:
+		length_ft = length_ft or dimensions[0]
+		width_ft = width_ft or dimensions[1]
+
+	return {
+		"length_ft": length_ft,
+		"width_ft": width_ft,
+		"plot_size_sqft": parse_area_sqft(row.get("plot_size")) or flt(length_ft * width_ft, 2),
+	}
+
+
+def backfill_numeric_dimensions(batch_size=1000):
+	"""Fill the numeric dimension columns of existing plots in batches, without touching modified"""
+	last_name = ""
+	while True:
+		rows = frappe.get_all(
+			"Plot Detail",
+			filters={"name": [">", last_name]},
+			fields=["name", *NUMERIC_DIMENSION_FIELDS, *NUMERIC_DIMENSION_FIELDS.values()],
+			order_by="name asc",
+			limit_page_length=batch_size,
+		)
+		if not rows:
+			break
+
+		for row in rows:
+			values = get_numeric_dimensions(row)
+			if any(flt(row.get(fieldname)) != value for fieldname, value in values.items()):
+				frappe.db.set_value("Plot Detail", row.name, values, update_modified=False)
 
+		frappe.db.commit()
+		last_name = rows[-1].name
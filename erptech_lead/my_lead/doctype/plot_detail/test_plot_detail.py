@@ -1,9 +1,44 @@
 # Copyright (c) 2025, erptech and Contributors
 # See license.txt
 
-# import frappe
+import frappe
 from frappe.tests.utils import FrappeTestCase
+from erptech_lead.api.doctype import list_data, update_data
 
 
 class TestPlotDetail(FrappeTestCase):
-	pass
+	def test_update_data_refreshes_numeric_dimensions(self):
+		lead = frappe.get_doc({
+			"doctype": "Lead",
+			"first_name": "Plot",
+			"last_name": "Test",
+			"custom_lead_status": "New",
+		}).insert()
+		plot = frappe.get_doc({
+			"doctype": "Plot Detail",
+			"lead": lead.name,
+			"plot_no": "DIM-TEST-1",
+			"plot_size": "1000",
+			"plot_status": "Available",
+			"lead_status": "New",
+		}).insert()
+		self.assertEqual(plot.plot_size_sqft, 1000)
+
+		frappe.local.form_dict = frappe._dict(
+			doctype="Plot Detail", name=plot.name, update_fields={"plot_size": "30x40"}
+		)
+		update_data()
+		self.assertEqual(
+			frappe.db.get_value("Plot Detail", plot.name, ["plot_size_sqft", "length_ft", "width_ft"]),
+			(1200, 30, 40),
+		)
+
+		frappe.local.form_dict = frappe._dict(
+			doctype="Plot Detail",
+			fields=["name"],
+			filters=[["name", "=", plot.name]],
+			ranges={"plot_size": [1100, 1300]},
+			page_length=10,
+		)
+		list_data()
+		self.assertEqual([row.name for row in frappe.local.response.data["data"]], [plot.name])
@@ -0,0 +1,154 @@
+# Copyright (c) 2026, erptech and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_days, getdate, now
+
+# Sales Order statuses that count as a deal (kept in line with get_sales_report)
+DEAL_STATUSES = ("Completed", "To Deliver and Bill", "To Bill", "Draft")
+
+
+class SalesDailyRollup(Document):
+	pass
+
+
+def on_doctype_update():
+	"""Composite index so date-range reads per agent are index range scans"""
+	frappe.db.add_index("Sales Daily Rollup", ["rollup_date", "agent"])
+
+
+def get_rollup_name(agent, day):
+	"""Deterministic name so each (agent, day) bucket is a single upsertable row"""
+	return f"{agent or ''}|{getdate(day)}"
+
+
+def refresh_bucket(agent, day):
+	"""
+	Recompute one (agent, day) bucket from Lead and Sales Order
+
+	Only the rows of that agent on that day are read, so the cost does not
+	grow with the size of either table.
+	"""
+	if not day:
+		return
+
+	agent = agent or ""
+	day = getdate(day)
+
+	leads_created = frappe.db.sql(
+		"""
+		SELECT COUNT(*)
+		FROM `tabLead`
+		WHERE creation >= %(day)s AND creation < %(next_day)s
+			AND IFNULL(custom_assigned_user, '') = %(agent)s
+		""",
+		{"day": day, "next_day": add_days(day, 1), "agent": agent},
+	)[0][0]
+
+	deals, revenue = frappe.db.sql(
+		"""
+		SELECT COUNT(*), IFNULL(SUM(COALESCE(NULLIF(grand_total, 0), total, 0)), 0)
+		FROM `tabSales Order`
+		WHERE transaction_date = %(day)s
+			AND IFNULL(custom_agent, '') = %(agent)s
+			AND status IN %(statuses)s
+		""",
+		{"day": day, "agent": agent, "statuses": DEAL_STATUSES},
+	)[0]
+
+	if not leads_created and not deals:
+		frappe.db.delete("Sales Daily Rollup", {"name": get_rollup_name(agent, day)})
+		return
+
+	upsert_bucket(agent, day, leads_created, deals, revenue)
+
+
+def upsert_bucket(agent, day, leads_created, deals, revenue):
+	"""Insert or overwrite a single bucket row"""
+	timestamp = now()
+	frappe.db.sql(
+		"""
+		INSERT INTO `tabSales Daily Rollup`
+			(name, agent, rollup_date, leads_created, deals, revenue,
+			creation, modified, owner, modified_by, docstatus, idx)
+		VALUES
+			(%(name)s, %(agent)s, %(day)s, %(leads_created)s, %(deals)s, %(revenue)s,
+			%(timestamp)s, %(timestamp)s, 'Administrator', 'Administrator', 0, 0)
+		ON DUPLICATE KEY UPDATE
+			leads_created = VALUES(leads_created),
+			deals = VALUES(deals),
+			revenue = VALUES(revenue),
+			modified = VALUES(modified)
+		""",
+		{
+			"name": get_rollup_name(agent, day),
+			"agent": agent,
+			"day": day,
+			"leads_created": leads_created or 0,
+			"deals": deals or 0,
+			"revenue": revenue or 0,
+			"timestamp": timestamp,
+		},
+	)
+
+
+def rebuild_rollup(from_date, to_date):
+	"""
+	Rebuild every bucket between from_date and to_date (inclusive) set-wise
+
+	Used for the initial backfill and for the nightly reconcile that catches
+	Sales Order status changes made through db_set (which fire no doc events).
+	"""
+	from_date, to_date = getdate(from_date), getdate(to_date)
+	values = {
+		"from_date": from_date,
+		"to_date": to_date,
+		"next_day": add_days(to_date, 1),
+		"statuses": DEAL_STATUSES,
+		"timestamp": now(),
+	}
+
+	frappe.db.sql(
+		"""
+		DELETE FROM `tabSales Daily Rollup`
+		WHERE rollup_date BETWEEN %(from_date)s AND %(to_date)s
+		""",
+		values,
+	)
+
+	frappe.db.sql(
+		"""
+		INSERT INTO `tabSales Daily Rollup`
+			(name, agent, rollup_date, leads_created, deals, revenue,
+			creation, modified, owner, modified_by, docstatus, idx)
+		SELECT
+			CONCAT(agent, '|', day), agent, day,
+			SUM(leads_created), SUM(deals), SUM(revenue),
+			%(timestamp)s, %(timestamp)s, 'Administrator', 'Administrator', 0, 0
+		FROM (
+			SELECT
+				IFNULL(custom_assigned_user, '') AS agent,
+				DATE(creation) AS day,
+				COUNT(*) AS leads_created,
+				0 AS deals,
+				0 AS revenue
+			FROM `tabLead`
+			WHERE creation >= %(from_date)s AND creation < %(next_day)s
+			GROUP BY agent, day
+			UNION ALL
+			SELECT
+				IFNULL(custom_agent, '') AS agent,
+				transaction_date AS day,
+				0 AS leads_created,
+				COUNT(*) AS deals,
+				SUM(COALESCE(NULLIF(grand_total, 0), total, 0)) AS revenue
+			FROM `tabSales Order`
+			WHERE transaction_date BETWEEN %(from_date)s AND %(to_date)s
+				AND status IN %(statuses)s
+			GROUP BY agent, day
+		) AS buckets
+		GROUP BY agent, day
+		""",
+		values,
+	)
@@ -0,0 +1,27 @@
+# Copyright (c) 2026, erptech and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import today
+from erptech_lead.my_lead.doctype.sales_daily_rollup.sales_daily_rollup import get_rollup_name
+
+
+class TestSalesDailyRollup(FrappeTestCase):
+	def test_new_lead_counts_for_assigned_agent(self):
+		bucket = get_rollup_name(frappe.session.user, today())
+		before = frappe.db.get_value("Sales Daily Rollup", bucket, "leads_created") or 0
+
+		lead = frappe.get_doc({
+			"doctype": "Lead",
+			"first_name": "Rollup",
+			"last_name": "Test",
+			"custom_lead_status": "New",
+		}).insert()
+
+		self.assertEqual(
+			frappe.db.get_value("Lead", lead.name, "custom_assigned_user"), frappe.session.user
+		)
+		self.assertEqual(
+			frappe.db.get_value("Sales Daily Rollup", bucket, "leads_created"), before + 1
+		)
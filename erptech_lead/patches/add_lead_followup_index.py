@@ -0,0 +1,14 @@
+import frappe
+
+
+def execute():
+    """
+    Index Lead's next follow-up date for the follow-up queue: per assigned user
+    first for agents' queues (equality before the range), and by date alone
+    for managers' queues across all agents
+    """
+    if not all(frappe.db.has_column("Lead", column) for column in ("custom_assigned_user", "custom_next_follow_up_date")):
+        return
+
+    frappe.db.add_index("Lead", ["custom_assigned_user", "custom_next_follow_up_date"])
+    frappe.db.add_index("Lead", ["custom_next_follow_up_date", "custom_assigned_user"])
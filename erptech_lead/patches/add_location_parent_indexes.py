@@ -0,0 +1,8 @@
+import frappe
+
+
+def execute():
+    """Index the parent links used by the State and City lookups"""
+    for doctype, column in (("State", "country"), ("City", "state")):
+        if frappe.db.table_exists(doctype) and frappe.db.has_column(doctype, column):
+            frappe.db.add_index(doctype, [column])
@@ -0,0 +1,8 @@
+import frappe
+from erptech_lead.my_lead.doctype.legal_spend_rollup.legal_spend_rollup import rebuild_spend_rollup
+
+
+def execute():
+    """Build Legal Spend Rollup from existing Legal Plot records"""
+    rebuild_spend_rollup()
+    frappe.db.commit()
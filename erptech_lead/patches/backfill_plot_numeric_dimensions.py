@@ -0,0 +1,11 @@
+import frappe
+
+
+def execute():
+    """Parse plot_size, length and width of existing plots into their numeric columns"""
+    frappe.enqueue(
+        "erptech_lead.my_lead.doctype.plot_detail.plot_detail.backfill_numeric_dimensions",
+        queue="long",
+        timeout=3600,
+        enqueue_after_commit=True,
+    )
@@ -0,0 +1,6 @@
+from erptech_lead.api.hooks import rebuild_sales_rollup_job
+
+
+def execute():
+    """Populate Sales Daily Rollup from existing Lead and Sales Order history"""
+    rebuild_sales_rollup_job()
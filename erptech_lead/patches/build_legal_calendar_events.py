@@ -0,0 +1,17 @@
+import frappe
+from erptech_lead.my_lead.doctype.legal_calendar_event.legal_calendar_event import (
+    CALENDAR_SOURCES,
+    get_calendar_fields,
+    insert_calendar_events,
+)
+
+
+def execute():
+    """Build Legal Calendar Event rows for existing Legal and Legal Plot records"""
+    frappe.db.delete("Legal Calendar Event")
+
+    for doctype, source in CALENDAR_SOURCES.items():
+        rows = frappe.get_all(doctype, fields=["name", *get_calendar_fields(source)])
+        for row in rows:
+            insert_calendar_events(doctype, row)
+        frappe.db.commit()
@@ -0,0 +1,11 @@
+import frappe
+from erptech_lead.my_lead.doctype.legal_case_link.legal_case_link import get_link_rows, insert_case_links
+
+
+def execute():
+    """Parse the linked case fields of existing Legal cases into Legal Case Link edges"""
+    frappe.db.delete("Legal Case Link")
+
+    for name in frappe.get_all("Legal", pluck="name"):
+        insert_case_links(name, get_link_rows(frappe.get_doc("Legal", name)))
+        frappe.db.commit()
@@ -0,0 +1,11 @@
+import frappe
+from erptech_lead.my_lead.doctype.legal_party.legal_party import get_party_rows, insert_parties
+
+
+def execute():
+    """Index the accused, complainant and organisation of existing Legal cases"""
+    frappe.db.delete("Legal Party")
+
+    for name in frappe.get_all("Legal", pluck="name"):
+        insert_parties(name, get_party_rows(frappe.get_doc("Legal", name)))
+        frappe.db.commit()
@@ -0,0 +1,14 @@
+import frappe
+from erptech_lead.my_lead.doctype.legal_search_index.legal_search_index import (
+    SEARCH_FIELDS,
+    get_search_content,
+    upsert_search_row,
+)
+
+
+def execute():
+    """Index the narrative fields of existing Legal cases"""
+    legals = frappe.get_all("Legal", fields=["name", *SEARCH_FIELDS])
+    for legal in legals:
+        upsert_search_row(legal.name, get_search_content(legal))
+    frappe.db.commit()
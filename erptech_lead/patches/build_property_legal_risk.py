@@ -0,0 +1,15 @@
+import frappe
+from erptech_lead.my_lead.doctype.legal_plot.legal_plot import refresh_property_risk
+
+
+def execute():
+    """Fill the Legal Risk fields of every property that has Legal Plot activities"""
+    properties = frappe.get_all(
+        "Legal Plot",
+        filters={"property_id": ["is", "set"]},
+        pluck="property_id",
+        distinct=True,
+    )
+    for property_id in properties:
+        refresh_property_risk(property_id)
+    frappe.db.commit()
@@ -0,0 +1,30 @@
+import frappe
+import json
+
+
+def execute():
+    """Move the JSON activity_log of every Legal into Legal Activity Log rows"""
+    legals = frappe.get_all(
+        "Legal",
+        filters={"activity_log": ["is", "set"]},
+        fields=["name", "activity_log"],
+    )
+
+    for legal in legals:
+        try:
+            entries = json.loads(legal.activity_log) or []
+        except (json.JSONDecodeError, TypeError):
+            entries = []
+
+        for entry in entries:
+            frappe.get_doc({
+                "doctype": "Legal Activity Log",
+                "legal": legal.name,
+                "activity_time": entry.get("timestamp"),
+                "user": entry.get("user"),
+                "action": entry.get("action"),
+                "changes": json.dumps(entry["changes"], default=str) if entry.get("changes") else None,
+            }).db_insert()
+
+        frappe.db.set_value("Legal", legal.name, "activity_log", None, update_modified=False)
+        frappe.db.commit()
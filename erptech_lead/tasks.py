@@ -0,0 +1,100 @@
+"""
+Scheduled Tasks for My Lead
+"""
+import frappe
+import json
+from frappe.utils import add_days, cint, formatdate, getdate, now_datetime, today
+from erptech_lead.my_lead.doctype.legal_plot.legal_plot import refresh_property_risk
+from erptech_lead.my_lead.doctype.sales_daily_rollup.sales_daily_rollup import rebuild_rollup
+
+# __global default holding the deadline alert job's high-water mark
+LEGAL_ALERT_MARK = "erptech_lead_legal_alert_mark"
+
+LEGAL_ALERT_FIELDS = [
+    "name", "event_date", "event_type", "source_doctype", "source_name",
+    "advocate", "court", "property_id", "alert_recipients",
+]
+
+
+def reconcile_sales_rollup():
+    """
+    Rebuild the last week of Sales Daily Rollup
+
+    Sales Order status changes made through db_set (delivery, billing,
+    closing) fire no doc events, so recent buckets are recomputed nightly.
+    """
+    rebuild_rollup(add_days(today(), -7), today())
+    frappe.db.commit()
+
+
+def get_legal_alert_days():
+    return cint(frappe.conf.get("erptech_lead_legal_alert_days")) or 7
+
+
+def send_legal_deadline_alerts():
+    """
+    Email one digest per recipient of Legal Calendar Events falling due soon
+
+    The high-water mark stores the horizon covered by the previous run and
+    when it ran. Each run reads only events that entered the alert window
+    since then (event_date after the old horizon) or were created/rewritten
+    since then with a date already inside it, both as event_date range scans.
+    An event is therefore alerted once, or again after its source record's
+    dates, court, advocate or alert settings change.
+    """
+    mark = json.loads(frappe.db.get_global(LEGAL_ALERT_MARK) or "{}")
+    run_at = now_datetime()
+    start = getdate(today())
+    horizon = getdate(add_days(start, get_legal_alert_days()))
+    last_horizon = getdate(mark["horizon"]) if mark.get("horizon") else add_days(start, -1)
+
+    filters = [["alert_recipients", "is", "set"]]
+    events = frappe.get_all(
+        "Legal Calendar Event",
+        filters=filters + [
+            ["event_date", ">", max(last_horizon, add_days(start, -1))],
+            ["event_date", "<=", horizon],
+        ],
+        fields=LEGAL_ALERT_FIELDS,
+    )
+    if mark.get("run_at") and last_horizon >= start:
+        events += frappe.get_all(
+            "Legal Calendar Event",
+            filters=filters + [
+                ["event_date", "between", [start, min(last_horizon, horizon)]],
+                ["creation", ">", mark["run_at"]],
+            ],
+            fields=LEGAL_ALERT_FIELDS,
+        )
+
+    digests = {}
+    for event in events:
+        for recipient in event.alert_recipients.split(","):
+            digests.setdefault(recipient.strip(), []).append(event)
+
+    for recipient, recipient_events in digests.items():
+        recipient_events.sort(key=lambda event: (event.event_date, event.source_name))
+        frappe.sendmail(
+            recipients=[recipient],
+            subject=f"Legal deadlines due by {formatdate(horizon)} ({len(recipient_events)})",
+            template="legal_deadline_digest",
+            args={"events": recipient_events, "horizon": horizon},
+            header=["Legal Deadline Alert", "orange"],
+        )
+
+    frappe.db.set_global(
+        LEGAL_ALERT_MARK, json.dumps({"horizon": str(max(horizon, last_horizon)), "run_at": str(run_at)})
+    )
+    frappe.db.commit()
+
+
+def refresh_passed_legal_deadlines():
+    """Move Plot Detail's next legal deadline forward once it has passed"""
+    properties = frappe.get_all(
+        "Plot Detail",
+        filters={"next_legal_deadline": ["<", today()]},
+        pluck="name",
+    )
+    for property_id in properties:
+        refresh_property_risk(property_id)
+    frappe.db.commit()
@@ -0,0 +1,47 @@
+"""
+Parsing of amounts entered as free text
+"""
+import re
+
+
+def parse_currency_string(value):
+    """
+    Parse a currency string (e.g., '50,000 AED', '1,234.56 USD') to float
+
+    Args:
+        value: String value that may contain currency formatting
+
+    Returns:
+        float: Numeric value extracted from the string, or 0 if parsing fails
+    """
+    if not value:
+        return 0.0
+
+    # Convert to string if it's not already
+    value_str = str(value).strip()
+
+    # If it's already a number, return it
+    try:
+        return float(value_str)
+    except (ValueError, TypeError):
+        pass
+
+    # Remove currency symbols and common currency codes (AED, USD, EUR, etc.)
+    # Remove any non-digit characters except decimal point and comma
+    # First, remove currency codes (3-letter codes at the end)
+    value_str = re.sub(r'\s*[A-Z]{2,3}\s*$', '', value_str, flags=re.IGNORECASE)
+
+    # Remove currency symbols ($, €, £, etc.)
+    value_str = re.sub(r'[$€£¥₹]', '', value_str)
+
+    # Remove commas (thousand separators)
+    value_str = value_str.replace(',', '')
+
+    # Strip whitespace
+    value_str = value_str.strip()
+
+    # Try to convert to float
+    try:
+        return float(value_str) if value_str else 0.0
+    except (ValueError, TypeError):
+        return 0.0
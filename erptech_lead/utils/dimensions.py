@@ -0,0 +1,110 @@
+"""
+Unit-aware parsing of plot sizes and lengths entered as free text
+"""
+import math
+import re
+
+from erptech_lead.utils.currency import parse_currency_string
+
+NUMBER = r"(\d[\d,]*(?:\.\d+)?|\.\d+)"
+
+# Area units (lower-cased, without dots or spaces) and their size in square feet
+AREA_UNITS = (
+    (r"sqft|sft|sqfeet|squarefeet|squarefoot|ft2|ft²", 1),
+    (r"sqm|sqmtrs?|sqmeters?|sqmetres?|squaremeters?|squaremetres?|m2|m²", 10.7639),
+    (r"sqyds?|sqyards?|squareyards?|gaj|gaz", 9),
+    (r"acres?|ac", 43560),
+    (r"hectares?|ha", 107639),
+    (r"cents?", 435.6),
+    (r"gunthas?|guntas?", 1089),
+    (r"grounds?", 2400),
+)
+
+# Length units and their size in feet
+LENGTH_UNITS = (
+    (r"ft|feet|foot|'", 1),
+    (r"m|mtrs?|meters?|metres?", 3.28084),
+    (r"in|inch|inches|\"", 1 / 12),
+    (r"yds?|yards?", 3),
+)
+
+
+def convert(number, unit, units):
+    """Multiply by the factor of `unit` (a missing unit counts as feet); None for an unknown unit"""
+    unit = re.sub(r"[\s.]", "", (unit or "").lower())
+    if not unit:
+        return number
+    for pattern, factor in units:
+        if re.fullmatch(pattern, unit):
+            return number * factor
+    return None
+
+
+def parse_length_ft(value):
+    """
+    Length in feet from text such as "30", "30 ft", "9.14 m" or "30' 6\\"", 0 when unparseable
+    """
+    text = str(value or "").strip().lower()
+    if not text:
+        return 0.0
+
+    feet_inches = re.fullmatch(rf"{NUMBER}\s*(?:'|ft|feet)\s*{NUMBER}\s*(?:\"|in|inch|inches)?", text)
+    if feet_inches:
+        return round(parse_currency_string(feet_inches.group(1)) + parse_currency_string(feet_inches.group(2)) / 12, 3)
+
+    match = re.fullmatch(rf"{NUMBER}\s*(.*)", text)
+    if not match:
+        return 0.0
+    length = convert(parse_currency_string(match.group(1)), match.group(2), LENGTH_UNITS)
+    return round(length, 3) if length is not None else 0.0
+
+
+def parse_dimensions_ft(value):
+    """
+    (length, width) in feet from text such as "30x40", "30 x 40 ft", "9m * 12m"
+    or "30x40 sqft", else None
+    """
+    text = str(value or "").strip().lower()
+
+    # A trailing area unit ("30x40 sqft", "9 x 12 sq.m") is the square of the sides' unit
+    side_factor = 1
+    area_unit = re.fullmatch(r"(.*\d)\s*([a-z][a-z.\s]*[a-z²2])", text)
+    if area_unit:
+        area_factor = convert(1, area_unit.group(2), AREA_UNITS)
+        if area_factor:
+            text = area_unit.group(1)
+            side_factor = math.sqrt(area_factor)
+
+    match = re.fullmatch(rf"{NUMBER}\s*([a-z'\"]*)\s*(?:x|\u00d7|\*|by)\s*{NUMBER}\s*([a-z'\"]*)", text)
+    if not match:
+        return None
+
+    # A unit written once ("30 x 40 ft") applies to both sides
+    first_unit, second_unit = match.group(2), match.group(4)
+    length = convert(parse_currency_string(match.group(1)), first_unit or second_unit, LENGTH_UNITS)
+    width = convert(parse_currency_string(match.group(3)), second_unit or first_unit, LENGTH_UNITS)
+    if length is None or width is None:
+        return None
+    if not (first_unit or second_unit):
+        length, width = length * side_factor, width * side_factor
+    return round(length, 3), round(width, 3)
+
+
+def parse_area_sqft(value):
+    """
+    Area in square feet from text such as "1200", "1,200 sq.ft", "111.5 sqm",
+    "5 cents", "30x40" or "30x40 sqft", 0 when unparseable. A bare number is taken as sq ft.
+    """
+    text = str(value or "").strip().lower()
+    if not text:
+        return 0.0
+
+    dimensions = parse_dimensions_ft(text)
+    if dimensions:
+        return round(dimensions[0] * dimensions[1], 2)
+
+    match = re.fullmatch(rf"{NUMBER}\s*(.*)", text)
+    if not match:
+        return 0.0
+    area = convert(parse_currency_string(match.group(1)), match.group(2), AREA_UNITS)
+    return round(area, 2) if area is not None else 0.0
@@ -0,0 +1,132 @@
+"""
+Field Diff helpers for audit trails (Legal, Legal Plot, Plot Detail)
+"""
+import frappe
+from frappe.model import default_fields, no_value_fields, table_fields
+from frappe.utils import cint, flt, get_datetime, get_time, getdate
+
+# Bookkeeping columns that change on every save and carry no audit value
+ALWAYS_EXCLUDED = frozenset(default_fields) | {"modified", "modified_by", "creation", "owner"}
+
+# How values of each fieldtype are brought to a common type when old and new differ in type
+NORMALIZERS = {
+    "Int": cint,
+    "Check": cint,
+    "Float": flt,
+    "Currency": flt,
+    "Percent": flt,
+    "Date": lambda value: getdate(value) if value else None,
+    "Datetime": lambda value: get_datetime(value) if value else None,
+    "Time": lambda value: get_time(value) if value else None,
+}
+
+# (doctype, excluded fields) -> (meta signature, scalar fields, table fields)
+_tracked_fields = {}
+
+
+def get_tracked_fields(doctype, exclude=()):
+    """
+    Tuples of ((fieldname, fieldtype), ...) for scalar fields and ((fieldname, child doctype), ...) for tables
+
+    Built once per process and rebuilt only when the doctype's meta changes
+    (modified timestamp or number of fields, which covers Custom Fields).
+    """
+    meta = frappe.get_meta(doctype)
+    key = (doctype, tuple(sorted(exclude)))
+    signature = (meta.modified, len(meta.fields))
+
+    cached = _tracked_fields.get(key)
+    if cached and cached[0] == signature:
+        return cached[1], cached[2]
+
+    excluded = ALWAYS_EXCLUDED | set(exclude)
+    scalar = tuple(
+        (df.fieldname, df.fieldtype)
+        for df in meta.fields
+        if df.fieldname not in excluded
+        and df.fieldtype not in no_value_fields
+        and df.fieldtype not in table_fields
+        and not df.is_virtual
+    )
+    tables = tuple(
+        (df.fieldname, df.options) for df in meta.fields
+        if df.fieldname not in excluded and df.fieldtype in table_fields
+    )
+    _tracked_fields[key] = (signature, scalar, tables)
+    return scalar, tables
+
+
+def values_differ(old, new, fieldtype):
+    """Compare native values, normalizing only when the types don't already match"""
+    if old == new:
+        return False
+    if old in (None, "") and new in (None, ""):
+        return False
+    normalize = NORMALIZERS.get(fieldtype)
+    if normalize and type(old) is not type(new):
+        try:
+            return normalize(old) != normalize(new)
+        except Exception:
+            return True
+    return True
+
+
+def as_text(value):
+    return str(value) if value is not None else None
+
+
+def diff_fields(old, new, fields):
+    changed = {}
+    for fieldname, fieldtype in fields:
+        old_value = old.get(fieldname)
+        new_value = new.get(fieldname)
+        if values_differ(old_value, new_value, fieldtype):
+            changed[fieldname] = {"old": as_text(old_value), "new": as_text(new_value)}
+    return changed
+
+
+def diff_table(doctype, old_rows, new_rows):
+    """Rows added, removed (by row name) and changed field by field"""
+    row_fields, _ = get_tracked_fields(doctype)
+    old_by_name = {row.name: row for row in old_rows}
+    new_by_name = {row.name: row for row in new_rows}
+
+    added = [name for name in new_by_name if name not in old_by_name]
+    removed = [name for name in old_by_name if name not in new_by_name]
+    changed = {}
+    for name, row in new_by_name.items():
+        if name in old_by_name:
+            row_changes = diff_fields(old_by_name[name], row, row_fields)
+            if row_changes:
+                changed[name] = row_changes
+
+    if not (added or removed or changed):
+        return None
+    return {"added": added, "removed": removed, "changed": changed}
+
+
+def get_changed_fields(doc, exclude=()):
+    """
+    Changes between a document and its state before this save
+
+    Returns {fieldname: {"old": ..., "new": ...}} for scalar fields and
+    {table_fieldname: {"added": [...], "removed": [...], "changed": {row: {...}}}}
+    for child tables. Empty when there is no previous version (new documents).
+    """
+    doc_before = doc.get_doc_before_save()
+    if not doc_before:
+        return {}
+
+    scalar_fields, tracked_tables = get_tracked_fields(doc.doctype, exclude)
+    changed = diff_fields(doc_before, doc, scalar_fields)
+
+    for fieldname, child_doctype in tracked_tables:
+        table_changes = diff_table(
+            child_doctype,
+            doc_before.get(fieldname) or [],
+            doc.get(fieldname) or [],
+        )
+        if table_changes:
+            changed[fieldname] = table_changes
+
+    return changed
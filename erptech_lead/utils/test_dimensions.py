@@ -0,0 +1,41 @@
+# Copyright (c) 2026, erptech and Contributors
+# See license.txt
+
+import unittest
+
+from erptech_lead.utils.dimensions import parse_area_sqft, parse_dimensions_ft, parse_length_ft
+
+
+class TestDimensions(unittest.TestCase):
+	def test_parse_length_ft(self):
+		self.assertEqual(parse_length_ft("30"), 30)
+		self.assertEqual(parse_length_ft("30 ft"), 30)
+		self.assertEqual(parse_length_ft("30' 6\""), 30.5)
+		self.assertEqual(parse_length_ft("9.14 m"), 29.987)
+		self.assertEqual(parse_length_ft(""), 0)
+		self.assertEqual(parse_length_ft("thirty"), 0)
+
+	def test_parse_dimensions_ft(self):
+		self.assertEqual(parse_dimensions_ft("30x40"), (30, 40))
+		self.assertEqual(parse_dimensions_ft("30 x 40 ft"), (30, 40))
+		self.assertEqual(parse_dimensions_ft("30 by 40"), (30, 40))
+		self.assertEqual(parse_dimensions_ft("30\u00d740"), (30, 40))
+		self.assertEqual(parse_dimensions_ft("9m * 12m"), (29.528, 39.37))
+		self.assertIsNone(parse_dimensions_ft("1200"))
+		self.assertIsNone(parse_dimensions_ft("30x40 furlongs"))
+
+	def test_parse_dimensions_ft_with_area_unit(self):
+		self.assertEqual(parse_dimensions_ft("30x40 sqft"), (30, 40))
+		self.assertEqual(parse_dimensions_ft("30 x 40 sq. ft"), (30, 40))
+		self.assertEqual(parse_dimensions_ft("10 x 20 sq yds"), (30, 60))
+
+	def test_parse_area_sqft(self):
+		self.assertEqual(parse_area_sqft("1200"), 1200)
+		self.assertEqual(parse_area_sqft("1,200 sq.ft"), 1200)
+		self.assertEqual(parse_area_sqft("100 sqm"), 1076.39)
+		self.assertEqual(parse_area_sqft("5 cents"), 2178)
+		self.assertEqual(parse_area_sqft("30x40"), 1200)
+		self.assertEqual(parse_area_sqft("30x40 sqft"), 1200)
+		self.assertEqual(parse_area_sqft("30 x 40 sq ft"), 1200)
+		self.assertEqual(parse_area_sqft(None), 0)
+		self.assertEqual(parse_area_sqft("corner plot"), 0)